@@ -0,0 +1,364 @@
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+import mysql.connector
+
+import DB_Dump
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# ---------------------------
+# Benchmark settings
+# ---------------------------
+# Both databases live on the local MySQL/MariaDB server from DB_Dump.py:
+# the source one stands in for the remote at 100.97.0.88.
+bench_source_db = "in_railin_bench_src"
+bench_target_db = "in_railin_bench_local"
+bench_seed = 42
+seed_batch_size = 10000
+
+# ---------------------------
+# Synthetic rail_rem_rake data
+# ---------------------------
+STATIONS = [
+    "NDLS", "BCT", "HWH", "MAS", "SBC", "SC", "ADI", "PUNE", "LKO", "CNB",
+    "ALD", "BPL", "NGP", "JBP", "GWL", "AGC", "JP", "JU", "BKN", "ASR",
+    "JAT", "UHP", "GHY", "NJP", "BBS", "VSKP", "BZA", "TPTY", "ERS", "TVC",
+    "CBE", "MDU", "HBL", "MAO", "RTM", "KOTA", "BRC", "ST", "DEE", "DLI",
+    "TKD", "GZB", "MB", "BE", "GKP", "PNBE", "DHN", "ASN", "KGP", "RNC",
+    "DURG", "R", "BSP", "SBP", "WAT", "KZJ", "GTL", "DMM", "UBL", "YPR",
+]
+RAKE_NAMES = [
+    "BOXN", "BOXNHL", "BCN", "BCNHL", "BTPN", "BTFLN", "BRN", "BOBRN",
+    "BCACBM", "BLCA", "BLCB", "NMG", "BCFC", "BOST", "BVZI", "NGCM",
+]
+MILITARY_RAKE_NAMES = ["DRDO/SPL", "SPL/MILY", "MILY/SPL", "DRDO/SPL/NGCM"]
+COMMODITIES = [
+    "COAL", "IRON ORE", "CEMENT", "FOOD GRAINS", "FERTILIZER", "CONTAINER",
+    "POL", "STEEL", "CLINKER", "SALT", "SUGAR", "AUTOMOBILE",
+]
+MILITARY_COMMODITIES = ["DEFENCE STORES", "ARMY VEHICLES", "MILITARY STORES", "ORDNANCE"]
+CONSIGNEES = [
+    "NTPC LTD", "SAIL BHILAI", "ACC CEMENT", "FCI DEPOT", "IOCL TERMINAL",
+    "CONCOR ICD", "TATA STEEL", "ULTRATECH", "HPCL DEPOT", "MARUTI SUZUKI",
+]
+MILITARY_CONSIGNEES = [
+    "COMDT COD DEHU ROAD", "CENTRAL ORDNANCE DEPOT AGRA", "DRDO DRDE GWALIOR",
+    "ARMY BASE WORKSHOP", "DEFENCE RESEARCH LAB",
+]
+STATUSES = ["L", "E", "P", "R", "U"]
+
+COLUMNS = [
+    ("RAVRAKEID", "VARCHAR(12)"),
+    ("RAVRAKENAME", "VARCHAR(24)"),
+    ("RAVSTTNFROM", "VARCHAR(8)"),
+    ("RAVSRVGSTTN", "VARCHAR(8)"),
+    ("RAVCMDT", "VARCHAR(40)"),
+    ("RAVCNSG", "VARCHAR(60)"),
+    ("RANUNTS", "INT"),
+    ("RAVSTTS", "VARCHAR(4)"),
+    ("RADSTTSCHNGTIME", "DATETIME"),
+]
+
+
+def generate_rows(n_rows, seed=bench_seed, military_share=0.02, start=datetime(2024, 1, 1), days=730):
+    # Yields lists of rows so even 10M rows never sit in memory at once
+    rng = random.Random(seed)
+    span = days * 86400
+    batch = []
+    for i in range(n_rows):
+        military = rng.random() < military_share
+        if military:
+            rake = rng.choice(MILITARY_RAKE_NAMES)
+            commodity = rng.choice(MILITARY_COMMODITIES)
+            consignee = rng.choice(MILITARY_CONSIGNEES)
+        else:
+            rake = rng.choice(RAKE_NAMES)
+            commodity = rng.choice(COMMODITIES)
+            consignee = rng.choice(CONSIGNEES)
+        src, dst = rng.sample(STATIONS, 2)
+        batch.append((
+            f"R{i:09d}",
+            rake,
+            src,
+            dst,
+            commodity,
+            consignee,
+            rng.randint(20, 58),
+            rng.choice(STATUSES),
+            start + timedelta(seconds=rng.randrange(span)),
+        ))
+        if len(batch) == seed_batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def parse_size(text):
+    text = text.strip().lower()
+    factor = {"k": 1_000, "m": 1_000_000}.get(text[-1], 1)
+    return int(float(text.rstrip("km")) * factor)
+
+
+def peak_rss_mb():
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on macOS
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+    return float("nan")
+
+
+def bench_connection(database=None):
+    return mysql.connector.connect(
+        host=DB_Dump.local_host,
+        user=DB_Dump.local_user,
+        password=DB_Dump.local_password,
+        database=database
+    )
+
+
+# ---------------------------
+# ETL benchmark
+# ---------------------------
+def seed_source(table, n_rows):
+    conn = bench_connection()
+    cursor = conn.cursor()
+    cursor.execute(f"CREATE DATABASE IF NOT EXISTS {bench_source_db};")
+    conn.database = bench_source_db
+    cursor.execute(f"DROP TABLE IF EXISTS {table};")
+    column_definitions = ", ".join(f"{name} {col_type}" for name, col_type in COLUMNS)
+    cursor.execute(f"CREATE TABLE {table} ({column_definitions}) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;")
+    columns_str = ", ".join(name for name, _ in COLUMNS)
+    placeholders = ", ".join(["%s"] * len(COLUMNS))
+    sql = f"INSERT INTO {table} ({columns_str}) VALUES ({placeholders})"
+    for batch in generate_rows(n_rows):
+        cursor.executemany(sql, batch)
+        conn.commit()
+    cursor.close()
+    conn.close()
+
+
+def reset_target():
+    conn = bench_connection()
+    cursor = conn.cursor()
+    cursor.execute(f"DROP DATABASE IF EXISTS {bench_target_db};")
+    cursor.close()
+    conn.close()
+
+
+def point_dump_at_stand_in(parquet_dir):
+    DB_Dump.remote_host = DB_Dump.local_host
+    DB_Dump.remote_user = DB_Dump.local_user
+    DB_Dump.remote_password = DB_Dump.local_password
+    DB_Dump.remote_db = bench_source_db
+    DB_Dump.local_db = bench_target_db
+    DB_Dump.parquet_dir = parquet_dir
+
+
+def timed_dump(table):
+    DB_Dump.prepare_local_db()
+    try:
+        result = DB_Dump.run_dump_table(table)
+    finally:
+        DB_Dump.close_all_connections()
+    if result["status"] != "ok":
+        raise RuntimeError(f"dump of {table} failed")
+    return result
+
+
+def run_etl_benchmark(sizes, keep=False, partition_by=None):
+    parquet_dir = tempfile.mkdtemp(prefix="bench_parquet_")
+    point_dump_at_stand_in(parquet_dir)
+    DB_Dump.partition_by = partition_by
+    reports = []
+    try:
+        for n_rows in sizes:
+            table = f"rail_rem_rake_bench_{n_rows}"
+            print(f"\n=== {n_rows:,} rows ===")
+
+            start = time.perf_counter()
+            seed_source(table, n_rows)
+            seed_seconds = time.perf_counter() - start
+            print(f"ℹ️ Seeded stand-in source in {seed_seconds:.1f}s.")
+
+            reset_target()
+            shutil.rmtree(os.path.join(parquet_dir, table), ignore_errors=True)
+            cold = timed_dump(table)
+            warm = timed_dump(table)  # incremental re-run over the same data
+            reports.append({
+                "rows": n_rows,
+                "seed": seed_seconds,
+                "cold": cold,
+                "warm": warm,
+                "rss": peak_rss_mb(),
+            })
+    finally:
+        if keep:
+            print(f"ℹ️ Parquet output kept in {parquet_dir}")
+        else:
+            shutil.rmtree(parquet_dir, ignore_errors=True)
+
+    print("\n" + "-" * 104)
+    print(f"{'Rows':>12}{'Seed s':>9}{'Setup s':>9}{'Copy s':>9}{'Export s':>10}"
+          f"{'Cold rows/s':>13}{'Warm s':>9}{'Warm rows/s':>13}{'Peak RSS MB':>13}")
+    print("-" * 104)
+    for r in reports:
+        phases = r["cold"]["phases"]
+        cold_rate = r["cold"]["rows"] / phases["copy"] if phases["copy"] > 0 else 0
+        warm_rate = r["warm"]["rows"] / r["warm"]["seconds"] if r["warm"]["seconds"] > 0 else 0
+        print(f"{r['rows']:>12,}{r['seed']:>9.1f}{phases['setup']:>9.1f}{phases['copy']:>9.1f}"
+              f"{phases['export']:>10.1f}{cold_rate:>13,.0f}{r['warm']['seconds']:>9.1f}"
+              f"{warm_rate:>13,.0f}{r['rss']:>13.0f}")
+    print("-" * 104)
+    print("ℹ️ Peak RSS is the process high-water mark after each size, so read it top-down.")
+
+
+# ---------------------------
+# Military classifier benchmark
+# ---------------------------
+def synthetic_frame(n_rows):
+    # Shaped like the frame Dashboard.load_data() classifies for mirrors without a flag column
+    import pandas as pd
+
+    names = [name for name, _ in COLUMNS]
+    df = pd.DataFrame.from_records(
+        (row for batch in generate_rows(n_rows) for row in batch), columns=names
+    )
+    df = df.astype({"RAVRAKENAME": "string", "RAVSTTNFROM": "string", "RAVSRVGSTTN": "string"})
+    df["RADSTTSCHNGTIME"] = pd.to_datetime(df["RADSTTSCHNGTIME"])
+    df["Date"] = df["RADSTTSCHNGTIME"].dt.date
+    df["Year"] = df["RADSTTSCHNGTIME"].dt.year
+    df["Month"] = df["RADSTTSCHNGTIME"].dt.month
+    return df
+
+
+def run_classifier_benchmark(n_rows, baseline_rows=None):
+    import Classifier
+
+    # detect_military() is the reference for the original keyword list
+    Classifier.use_rules(Classifier.DEFAULT_RULES)
+    df = synthetic_frame(n_rows)
+    baseline_df = df if baseline_rows is None else df.head(baseline_rows)
+    print(f"ℹ️ {len(df):,} rows, row-wise baseline on {len(baseline_df):,} rows.")
+
+    start = time.perf_counter()
+    expected = baseline_df.apply(Classifier.detect_military, axis=1)
+    baseline_seconds = (time.perf_counter() - start) * len(df) / len(baseline_df)
+
+    start = time.perf_counter()
+    keywords = Classifier.military_matches(df)
+    vector_seconds = time.perf_counter() - start
+    flags = keywords.notna()
+
+    identical = flags.loc[baseline_df.index].equals(expected.astype(bool))
+    # DB_Dump.py stores match_row() of each raw row, it must pick the same keyword
+    names = [name for name, col_type in COLUMNS]
+    targets = [name if col_type.startswith("VARCHAR") else None for name, col_type in COLUMNS]
+    ingest = [Classifier.match_row(row, targets) for row in baseline_df[names].itertuples(index=False)]
+    identical = identical and list(keywords.loc[baseline_df.index]) == ingest
+    print(f"{'row-wise apply':<22}{baseline_seconds:>10.2f}s"
+          f"{'  (extrapolated)' if baseline_rows is not None else ''}")
+    print(f"{'vectorized':<22}{vector_seconds:>10.2f}s")
+    print(f"{'speedup':<22}{baseline_seconds / vector_seconds:>10.1f}x")
+    print(f"{'military rows':<22}{int(flags.sum()):>10,}")
+    print(f"{'identical flags':<22}{str(identical):>10}")
+    if not identical:
+        raise SystemExit("❌ vectorized flags or keywords differ from the row-wise classification")
+
+
+def unit_codes(n, seed=bench_seed):
+    # Made-up unit/consignee codes to grow the rule set with
+    rng = random.Random(seed)
+    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+    codes = set()
+    while len(codes) < n:
+        codes.add("".join(rng.choice(alphabet) for _ in range(rng.randint(4, 8))))
+    return sorted(codes)
+
+
+def run_rules_benchmark(n_rows, keyword_counts):
+    # Matching cost per keyword count: the compiled trie vs a plain
+    # "A|B|C" alternation over the same distinct column values.
+    import re
+    import numpy as np
+    import pandas as pd
+    import Classifier
+
+    df = synthetic_frame(n_rows)
+    text_values = [pd.factorize(df[col])[1] for col in df.columns if Classifier.is_text_series(df[col])]
+    print(f"ℹ️ {len(df):,} rows, {sum(len(v) for v in text_values):,} distinct text values.")
+    print("-" * 70)
+    print(f"{'Keywords':>10}{'Trie (s)':>12}{'Alternation (s)':>17}{'Dashboard (s)':>15}{'Military':>10}{'Same':>6}")
+    print("-" * 70)
+    codes = unit_codes(max(keyword_counts))
+    for count in keyword_counts:
+        keywords = Classifier.MILITARY_KEYWORDS + codes[:max(0, count - len(Classifier.MILITARY_KEYWORDS))]
+        trie = re.compile(Classifier.trie_regex(sorted(keywords)))
+        alternation = re.compile("|".join(re.escape(k) for k in keywords))
+
+        timings, hits = [], []
+        for pattern in (trie, alternation):
+            start = time.perf_counter()
+            matched = [Classifier.keyword_matches(values, pattern) for values in text_values]
+            timings.append(time.perf_counter() - start)
+            hits.append([np.not_equal(m, None) for m in matched])
+        same = all((a == b).all() for a, b in zip(*hits))
+
+        Classifier.use_rules([{"keywords": keywords, "columns": None, "word_boundary": False}])
+        start = time.perf_counter()
+        military = int(Classifier.classify_military(df).sum())
+        dashboard_seconds = time.perf_counter() - start
+        print(f"{len(keywords):>10,}{timings[0]:>12.3f}{timings[1]:>17.3f}{dashboard_seconds:>15.3f}"
+              f"{military:>10,}{str(same):>6}")
+    print("-" * 70)
+    Classifier.use_rules(None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the rail dashboard pipeline.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    etl = commands.add_parser("etl", help="seed a synthetic rail_rem_rake table and time DB_Dump on it")
+    etl.add_argument("--rows", nargs="+", default=["10k"], help="table sizes, e.g. 10k 1m 10m")
+    etl.add_argument("--partition-by", choices=["year", "month"], default=None)
+    etl.add_argument("--keep", action="store_true", help="keep the Parquet output")
+
+    classify = commands.add_parser("classify", help="row-wise detect_military vs the vectorized classifier")
+    classify.add_argument("--rows", default="1m", help="synthetic rows, e.g. 100k or 1m")
+    classify.add_argument("--baseline-rows", default=None,
+                          help="time the slow row-wise path on this many rows only and extrapolate")
+
+    rules = commands.add_parser("rules", help="classification cost as the keyword list grows")
+    rules.add_argument("--rows", default="1m", help="synthetic rows, e.g. 100k or 1m")
+    rules.add_argument("--keywords", nargs="+", type=int, default=[8, 100, 500, 1000],
+                       help="rule set sizes to time")
+
+    args = parser.parse_args()
+    if args.command == "etl":
+        run_etl_benchmark([parse_size(size) for size in args.rows], args.keep, args.partition_by)
+    elif args.command == "classify":
+        baseline_rows = parse_size(args.baseline_rows) if args.baseline_rows else None
+        run_classifier_benchmark(parse_size(args.rows), baseline_rows)
+    elif args.command == "rules":
+        run_rules_benchmark(parse_size(args.rows), args.keywords)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+import json
+import os
+import re
+import numpy as np
+import pandas as pd
+
+# ---------------------------
+# Classification rules, shared by DB_Dump.py (ingest) and Dashboard.py.
+# rules_file holds named rule sets; each rule is
+#   {"keywords": [...], "columns": [...] or null, "word_boundary": true/false}
+# "columns" restricts the rule to those text columns (null = every text
+# column), "word_boundary" only matches whole words ("SPL" but not "SPLIT").
+# All keywords that apply to a column are compiled into one trie-shaped
+# regex, so matching cost does not grow with the number of keywords.
+# ---------------------------
+rules_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "classification_rules.json")
+rule_set = "military"
+
+# MySQL DATA_TYPEs rules are matched against, at ingest and in the
+# dashboard alike (binary/blob values are bytes, never keyword text)
+TEXT_TYPES = ("char", "varchar", "tinytext", "text", "mediumtext", "longtext", "enum", "set")
+
+# Used when rules_file is missing; the original hardcoded behaviour
+MILITARY_KEYWORDS = ["DRDO", "ARMY", "MILY", "MILITARY", "DEFENCE", "DEFENSE", "ORDNANCE", "SPL"]
+DEFAULT_RULES = [{"keywords": MILITARY_KEYWORDS, "columns": None, "word_boundary": False}]
+
+_rules = None
+_patterns = {}
+
+
+def detect_military(row):
+    # Row-wise reference for DEFAULT_RULES, kept for Benchmark.py
+    text = " ".join(str(x) for x in row.values).upper()
+    return any(k in text for k in MILITARY_KEYWORDS)
+
+
+def load_rules(path=None, name=None):
+    path = path or rules_file
+    name = name or rule_set
+    if not os.path.exists(path):
+        print(f"Warning: {path} not found → using the built-in military keywords")
+        return DEFAULT_RULES
+    with open(path, encoding="utf-8") as f:
+        rule_sets = json.load(f)
+    if name not in rule_sets:
+        raise ValueError(f"Rule set '{name}' not found in {path}")
+    rules = []
+    for rule in rule_sets[name]:
+        keywords = [k.strip().upper() for k in rule["keywords"] if k.strip()]
+        if keywords:
+            rules.append({
+                "keywords": keywords,
+                "columns": rule.get("columns"),
+                "word_boundary": bool(rule.get("word_boundary", False))
+            })
+    return rules
+
+
+def current_rules():
+    global _rules
+    if _rules is None:
+        _rules = load_rules()
+    return _rules
+
+
+def use_rules(rules):
+    # Swap the active rules (None = reload rules_file) and drop compiled patterns
+    global _rules
+    _rules = rules
+    _patterns.clear()
+
+
+def rule_columns(columns):
+    # The subset of columns that at least one rule looks at
+    rules = current_rules()
+    if any(rule["columns"] is None for rule in rules):
+        return list(columns)
+    targeted = {col for rule in rules for col in rule["columns"]}
+    return [col for col in columns if col in targeted]
+
+
+def trie_regex(keywords):
+    # Keywords sharing a prefix share one branch ("DEFENCE", "DEFENSE" ->
+    # DEFEN(?:CE|SE)), so at each position the regex follows one path down
+    # the trie instead of trying every keyword in turn.
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def source(node):
+        branches = [re.escape(ch) + source(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # A keyword ends here: the longer ones are tried first, then this one
+        return f"(?:{body})?" if "" in node else body
+
+    return source(trie)
+
+
+def column_pattern(column):
+    # One compiled pattern per column for all rules that apply to it, None if none do
+    if column not in _patterns:
+        plain, whole_word = set(), set()
+        for rule in current_rules():
+            if rule["columns"] is None or column in rule["columns"]:
+                (whole_word if rule["word_boundary"] else plain).update(rule["keywords"])
+        parts = []
+        if whole_word:
+            parts.append(rf"(?<!\w)(?:{trie_regex(sorted(whole_word))})(?!\w)")
+        if plain:
+            parts.append(trie_regex(sorted(plain)))
+        _patterns[column] = re.compile("|".join(parts)) if parts else None
+    return _patterns[column]
+
+
+def match_row(values, columns):
+    # One raw row (tuple) at ingest: the first keyword found, column by column, or None.
+    # columns names each value, None for values no rule should look at (e.g. numbers).
+    for value, column in zip(values, columns):
+        if column is None or value is None:
+            continue
+        pattern = column_pattern(column)
+        if pattern is not None:
+            match = pattern.search(str(value).upper())
+            if match:
+                return match.group(0)
+    return None
+
+
+def keyword_matches(values, pattern):
+    # One regex pass over all values joined into a single string; each match
+    # is mapped back to the value it falls in (the first match per value wins).
+    texts = np.asarray(values, dtype=object).tolist()
+    if not pd.api.types.is_string_dtype(values):
+        texts = [str(v) for v in texts]
+    matches = np.full(len(texts), None, dtype=object)
+    if not texts:
+        return matches
+    joined = "\x00".join(texts).upper()
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    if len(joined) != lengths.sum() + len(texts) - 1:
+        # upper() changed a length (e.g. "ß" -> "SS"), offsets would be off
+        for i, text in enumerate(texts):
+            match = pattern.search(text.upper())
+            matches[i] = match.group(0) if match else None
+        return matches
+    starts = np.concatenate(([0], np.cumsum(lengths + 1)[:-1]))
+    found = [(m.start(), m.group(0)) for m in pattern.finditer(joined)]
+    if found:
+        positions = np.fromiter((pos for pos, _ in found), dtype=np.int64, count=len(found))
+        owners = np.searchsorted(starts, positions, side="right") - 1
+        # Matches come in text order, so a value's first entry is its leftmost match
+        owners, first = np.unique(owners, return_index=True)
+        matches[owners] = np.array([kw for _, kw in found], dtype=object)[first]
+    return matches
+
+
+def is_text_series(values):
+    return not (pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values)
+                or pd.api.types.is_datetime64_any_dtype(values)
+                or pd.api.types.is_timedelta64_dtype(values))
+
+
+def military_matches(df):
+    # Same result as match_row() on every row, column by column: each
+    # distinct value of a text column is tested once, then mapped back to
+    # its rows. Numbers, dates and bools are never matched. Returns the
+    # matched keyword per row (first column wins), None for the rest.
+    result = np.full(len(df), None, dtype=object)
+    found = np.zeros(len(df), dtype=bool)
+    for col in df.columns:
+        values = df[col]
+        pattern = column_pattern(col)
+        if pattern is None or not is_text_series(values):
+            continue
+        codes, uniques = pd.factorize(values)
+        # Missing values get code -1, which lands on the trailing None/False
+        unique_matches = np.append(keyword_matches(uniques, pattern), None)
+        hits = np.append(np.not_equal(unique_matches[:-1], None), False)[codes]
+        new = hits & ~found
+        result[new] = unique_matches[codes[new]]
+        found |= hits
+    return pd.Series(result, index=df.index, dtype=object)
+
+
+def classify_military(df):
+    return military_matches(df).notna()
@@ -1,4 +1,18 @@
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
 import mysql.connector
+from Classifier import TEXT_TYPES, match_row
+from Mirror_Schema import flag_column, keyword_column, null_timestamp, parquet_dir, rollup_null_day, version_table
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = pq = None
 
 # -----------------------------
 # Remote MySQL connection
@@ -17,86 +31,1089 @@ local_user = "root"
 local_password = "admin"
 local_db = "in_railin_local"
 
-try:
-    # Connect to remote DB
-    remote_conn = mysql.connector.connect(
+# -----------------------------
+# Load settings
+# -----------------------------
+batch_size = 5000  # rows per multi-row INSERT IGNORE (1 = old row-by-row behaviour)
+stream_rows = True  # read the remote table in chunks instead of fetchall()
+stream_chunk_size = 50000  # rows held in memory at once while streaming
+
+# -----------------------------
+# Incremental sync settings
+# -----------------------------
+incremental = True  # only pull rows newer than the last synced high-water mark
+sync_time_column = "RADSTTSCHNGTIME"
+sync_tiebreak_column = "RAVRAKENAME"  # orders rows sharing the same timestamp
+sync_overlap_minutes = 60  # re-read this much history for late-arriving updates (0 = strict)
+state_table = "dump_sync_state"
+resumable = True  # commit every chunk with a checkpoint so an interrupted run picks up where it stopped
+
+# -----------------------------
+# Local schema settings
+# -----------------------------
+timestamp_columns = ["RADSTTSCHNGTIME"]  # always mirrored as DATETIME
+index_columns = ["RADSTTSCHNGTIME", "RAVRAKENAME", "RAVSTTNFROM", "RAVSRVGSTTN"]
+max_varchar_length = 768  # longest text column still turned into an indexable VARCHAR
+min_varchar_length = 191  # indexed TEXT columns never get less (longest utf8mb4 key that always fits an index)
+hash_column = "row_hash"  # MD5 of the row content, the only unique key used for dedup
+
+# -----------------------------
+# Military classification (rules in Classifier.py), stored per row at ingest
+# in flag_column/keyword_column (names in Mirror_Schema.py)
+# -----------------------------
+classify_rows = True
+reclassify = False  # re-run the rules over rows already mirrored, e.g. after editing them
+
+# -----------------------------
+# Rollups: <table>_rollup holds movement counts and first/last times per
+# (day, military_flag, rake, from, to), kept up to date chunk by chunk
+# -----------------------------
+maintain_rollups = True
+rollup_keys = ["RAVRAKENAME", "RAVSTTNFROM", "RAVSRVGSTTN"]
+rollup_state_table = "dump_rollup_state"  # last local_id folded into each rollup
+
+# -----------------------------
+# Partitioning settings (new mirrors only)
+# -----------------------------
+partition_by = None  # "year" or "month": RANGE COLUMNS partitions on sync_time_column
+partition_retention = None  # keep this many most recent periods, older partitions are retired
+archive_partitions = True  # retired partitions are swapped out to <table>_<partition> instead of dropped
+
+# -----------------------------
+# Multi-snapshot settings
+# -----------------------------
+snapshot_tables = None  # explicit list of tables to mirror, None -> just table_name
+discover_snapshots = False  # mirror every remote table matching snapshot_pattern
+snapshot_pattern = "rail_rem_rake_%"
+max_workers = 4  # tables copied concurrently, each worker holds one remote + local connection
+
+# -----------------------------
+# Parquet export settings
+# -----------------------------
+export_parquet = True  # also write each table as <parquet_dir>/<table>/year=YYYY/month=M/*.parquet (Mirror_Schema.py)
+
+
+def insert_batch(cursor, table, columns, batch):
+    # executemany() rewrites INSERT ... VALUES into one multi-row statement,
+    # so a whole batch costs a single round-trip. rowcount only counts rows
+    # that were actually inserted, duplicates skipped by IGNORE are excluded.
+    columns_str = ", ".join(columns)
+    placeholders = ", ".join(["%s"] * len(columns))
+    sql = f"INSERT IGNORE INTO {table} ({columns_str}) VALUES ({placeholders})"
+    cursor.executemany(sql, batch)
+    return max(cursor.rowcount, 0)
+
+
+def fetch_chunks(cursor, chunk_size):
+    # Works on an unbuffered cursor: rows stay on the socket until asked for,
+    # so only one chunk is ever held in Python memory.
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        yield rows
+
+
+def ensure_state_table(cursor):
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {state_table} (
+        table_name VARCHAR(64) PRIMARY KEY,
+        last_change_time DATETIME NULL,
+        last_tiebreak VARCHAR(255) NULL,
+        rows_synced BIGINT NOT NULL DEFAULT 0,
+        status VARCHAR(16) NOT NULL DEFAULT 'done',
+        run_from DATETIME NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """)
+    # State tables created before checkpoints existed lack the run columns
+    if "status" not in column_types(cursor, state_table):
+        cursor.execute(f"""
+        ALTER TABLE {state_table}
+            ADD COLUMN status VARCHAR(16) NOT NULL DEFAULT 'done',
+            ADD COLUMN run_from DATETIME NULL
+        """)
+
+
+def load_sync_state(cursor, table):
+    cursor.execute(
+        f"SELECT last_change_time, last_tiebreak, status, run_from FROM {state_table} "
+        f"WHERE table_name = %s",
+        (table,)
+    )
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    last_time, last_tiebreak, status, run_from = row
+    return {
+        "since": (last_time, last_tiebreak or "") if last_time is not None else None,
+        "status": status,
+        "run_from": run_from,
+        # mark_sync_running() clears the tie-breaker, the first chunk checkpoint sets it
+        "checkpointed": last_tiebreak is not None
+    }
+
+
+def mark_sync_running(cursor, table, run_from, fresh=True):
+    # run_from remembers where this run started, so a resumed run still knows
+    # which Parquet partitions the interrupted part touched. A fresh run also
+    # moves the mark back to run_from: until its first chunk checkpoints,
+    # a resume has to re-read the whole run, overlap window included.
+    if fresh:
+        cursor.execute(f"""
+        INSERT INTO {state_table} (table_name, status, run_from, last_change_time, last_tiebreak)
+        VALUES (%s, 'running', %s, %s, NULL)
+        ON DUPLICATE KEY UPDATE status = 'running', run_from = VALUES(run_from),
+            last_change_time = VALUES(last_change_time), last_tiebreak = NULL
+        """, (table, run_from, run_from))
+    else:
+        cursor.execute(f"""
+        INSERT INTO {state_table} (table_name, status, run_from)
+        VALUES (%s, 'running', %s)
+        ON DUPLICATE KEY UPDATE status = 'running', run_from = VALUES(run_from)
+        """, (table, run_from))
+
+
+def save_sync_state(cursor, table, high_water, rows_synced, status="done"):
+    last_time, last_tiebreak = high_water if high_water is not None else (None, None)
+    cursor.execute(f"""
+    INSERT INTO {state_table} (table_name, last_change_time, last_tiebreak, rows_synced, status)
+    VALUES (%s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        last_tiebreak = IF(VALUES(last_change_time) IS NULL, last_tiebreak, VALUES(last_tiebreak)),
+        last_change_time = COALESCE(VALUES(last_change_time), last_change_time),
+        rows_synced = rows_synced + VALUES(rows_synced),
+        status = VALUES(status)
+    """, (table, last_time, last_tiebreak, rows_synced, status))
+
+
+def ensure_version_table(cursor):
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {version_table} (
+        table_name VARCHAR(64) PRIMARY KEY,
+        version BIGINT NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """)
+
+
+def bump_data_version(cursor, table):
+    # Dashboard.py caches by this version: call it in the same transaction
+    # as every change to the table's rows, flags or rollup
+    cursor.execute(f"""
+    INSERT INTO {version_table} (table_name, version) VALUES (%s, 1)
+    ON DUPLICATE KEY UPDATE version = version + 1
+    """, (table,))
+
+
+def build_select(table, since, keyset=False, ordered=False, start=None):
+    # No state yet -> full copy. With an overlap window the recent history is
+    # read again and INSERT IGNORE drops what we already have. A resumed run,
+    # or an overlap of 0, continues from the (time, tie-breaker) keyset; >= on
+    # the tie-breaker re-reads rows sharing the exact key rather than skip them.
+    # start re-reads from a run's own start (resume before its first checkpoint).
+    # Checkpointed runs read in key order so the last key of a chunk marks
+    # everything before it as done.
+    where, params = "", ()
+    if start is not None:
+        where, params = f" WHERE {sync_time_column} >= %s", (start,)
+    elif since is not None:
+        last_time, last_tiebreak = since
+        if keyset or sync_overlap_minutes <= 0:
+            where = (f" WHERE {sync_time_column} > %s "
+                     f"OR ({sync_time_column} = %s AND {sync_tiebreak_column} >= %s)")
+            params = (last_time, last_time, last_tiebreak)
+        else:
+            where = f" WHERE {sync_time_column} >= %s"
+            params = (last_time - timedelta(minutes=sync_overlap_minutes),)
+    order = f" ORDER BY {sync_time_column}, {sync_tiebreak_column}" if ordered else ""
+    return f"SELECT * FROM {table}{where}{order};", params
+
+
+def run_start(since, keyset=False):
+    if since is None:
+        return None
+    if keyset or sync_overlap_minutes <= 0:
+        return since[0]
+    return since[0] - timedelta(minutes=sync_overlap_minutes)
+
+
+def table_exists(cursor, table):
+    cursor.execute(
+        "SELECT COUNT(*) FROM INFORMATION_SCHEMA.TABLES "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+        (table,)
+    )
+    return cursor.fetchone()[0] > 0
+
+
+def column_types(cursor, table):
+    cursor.execute(
+        "SELECT COLUMN_NAME, COLUMN_TYPE FROM INFORMATION_SCHEMA.COLUMNS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s ORDER BY ORDINAL_POSITION",
+        (table,)
+    )
+    return {name: col_type.lower() for name, col_type in cursor.fetchall()}
+
+
+def index_names(cursor, table):
+    cursor.execute(
+        "SELECT DISTINCT INDEX_NAME FROM INFORMATION_SCHEMA.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+        (table,)
+    )
+    return {row[0] for row in cursor.fetchall()}
+
+
+def is_text_type(col_type):
+    return col_type.endswith("text") or col_type.endswith("blob")
+
+
+def infer_local_types(cursor, table):
+    # Mirror the remote column types, but never leave the timestamp or the
+    # indexed filter columns as TEXT: timestamps become DATETIME and TEXT
+    # becomes a VARCHAR with room for twice the longest value stored, and at
+    # least min_varchar_length. The remote snapshot may still be empty here,
+    # and INSERT IGNORE would silently cut longer values arriving later.
+    types = column_types(cursor, table)
+    for col in timestamp_columns:
+        if col in types:
+            types[col] = "datetime"
+
+    text_cols = [col for col in index_columns if col in types and is_text_type(types[col])]
+    if text_cols:
+        lengths = ", ".join(f"MAX(CHAR_LENGTH({col}))" for col in text_cols)
+        cursor.execute(f"SELECT {lengths} FROM {table}")
+        for col, longest in zip(text_cols, cursor.fetchone()):
+            size = max(min_varchar_length, 2 * int(longest or 0))
+            if size <= max_varchar_length:
+                types[col] = f"varchar({size})"
+    return types
+
+
+def ensure_indexes(cursor, table):
+    existing = index_names(cursor, table)
+    types = column_types(cursor, table)
+    for col in index_columns:
+        name = f"idx_{col}"
+        if col not in types or name in existing:
+            continue
+        # Mirrors created before typed schemas still hold TEXT, index a prefix
+        key = f"{col}(191)" if is_text_type(types[col]) else col
+        cursor.execute(f"CREATE INDEX {name} ON {table} ({key})")
+        print(f"✅ Index '{name}' created on {table}.")
+
+
+def row_hash(row):
+    # Keep in sync with row_hash_sql(): NULL -> \N, values joined by 0x1F
+    text = "\x1f".join("\\N" if value is None else str(value) for value in row)
+    return hashlib.md5(text.encode("utf-8")).digest()
+
+
+def row_hash_sql(columns):
+    parts = ", ".join(f"COALESCE({col}, '\\\\N')" for col in columns)
+    return f"UNHEX(MD5(CONCAT_WS(CHAR(31), {parts})))"
+
+
+def with_row_hash(rows):
+    return [(*row, row_hash(row)) for row in rows]
+
+
+def ensure_row_hash(cursor, table, columns):
+    # Mirrors created before the hash key: add and backfill the column, drop
+    # rows the old all-columns index failed to dedup, then swap the indexes.
+    types = column_types(cursor, table)
+    if hash_column not in types:
+        print(f"ℹ️ Adding {hash_column} to '{table}' and backfilling it...")
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {hash_column} BINARY(16) NULL")
+        cursor.execute(f"UPDATE {table} SET {hash_column} = {row_hash_sql(columns)}")
+        # Plain index first so the self-join below is an index lookup, not a
+        # nested loop over the whole table (MariaDB has no hash join)
+        cursor.execute(f"CREATE INDEX idx_{hash_column} ON {table} ({hash_column})")
+        cursor.execute(f"""
+        DELETE newer FROM {table} newer
+        JOIN {table} older
+          ON newer.{hash_column} = older.{hash_column} AND newer.local_id > older.local_id
+        """)
+        if cursor.rowcount > 0:
+            print(f"ℹ️ Removed {cursor.rowcount} duplicate rows from '{table}'.")
+            bump_data_version(cursor, table)
+
+    existing = index_names(cursor, table)
+    if f"uniq_{table}" in existing:
+        cursor.execute(f"DROP INDEX uniq_{table} ON {table}")
+    if f"uniq_{hash_column}" not in existing:
+        cursor.execute(f"CREATE UNIQUE INDEX uniq_{hash_column} ON {table} ({hash_column})")
+        print(f"✅ Unique index on {hash_column} ensured (duplicates prevention enabled).")
+    if f"idx_{hash_column}" in existing:
+        cursor.execute(f"DROP INDEX idx_{hash_column} ON {table}")
+
+
+def rule_targets(cursor, table, columns):
+    # Column name per value for match_row(), None for non-text columns
+    types = column_types(cursor, table)
+    return [col if types[col].split("(")[0] in TEXT_TYPES else None for col in columns]
+
+
+def military_values(row, targets):
+    keyword = match_row(row, targets)
+    return (0 if keyword is None else 1, keyword)
+
+
+def classified(rows, targets):
+    # Hash and classification both look at the remote columns only
+    return [(*row, row_hash(row), *military_values(row, targets)) for row in rows]
+
+
+def ensure_classification(local_conn, cursor, table, columns, targets):
+    # Mirrors created before the flag columns: add them, then classify every
+    # row still without a flag. New rows arrive classified, so after the
+    # first run this finds nothing. Returns the number of rows classified.
+    types = column_types(cursor, table)
+    if flag_column not in types:
+        print(f"ℹ️ Adding {flag_column}/{keyword_column} to '{table}'...")
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {flag_column} TINYINT NULL, "
+                       f"ADD COLUMN {keyword_column} VARCHAR(64) NULL")
+    elif reclassify:
+        print(f"ℹ️ Clearing {flag_column} in '{table}' to re-apply the rules...")
+        cursor.execute(f"UPDATE {table} SET {flag_column} = NULL, {keyword_column} = NULL")
+        bump_data_version(cursor, table)
+    if f"idx_{flag_column}" not in index_names(cursor, table):
+        # Flag first, so "flagged rows in a time range" is one index range
+        key = f"{flag_column}, {sync_time_column}" if sync_time_column in columns else flag_column
+        cursor.execute(f"CREATE INDEX idx_{flag_column} ON {table} ({key})")
+        print(f"✅ Index 'idx_{flag_column}' created on {table}.")
+    local_conn.commit()
+
+    classified_count = 0
+    last_id = 0
+    while True:
+        cursor.execute(
+            f"SELECT local_id, {', '.join(columns)} FROM {table} "
+            f"WHERE local_id > %s AND {flag_column} IS NULL ORDER BY local_id LIMIT %s",
+            (last_id, stream_chunk_size)
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        matches = []
+        for row in rows:
+            keyword = match_row(row[1:], targets)
+            if keyword is not None:
+                matches.append((keyword, row[0]))
+        if matches:
+            cursor.executemany(
+                f"UPDATE {table} SET {flag_column} = 1, {keyword_column} = %s WHERE local_id = %s",
+                matches
+            )
+        cursor.execute(
+            f"UPDATE {table} SET {flag_column} = 0 "
+            f"WHERE local_id BETWEEN %s AND %s AND {flag_column} IS NULL",
+            (rows[0][0], rows[-1][0])
+        )
+        bump_data_version(cursor, table)
+        local_conn.commit()
+        last_id = rows[-1][0]
+        classified_count += len(rows)
+    if classified_count:
+        print(f"✅ Classified {classified_count} existing rows in '{table}'.")
+    return classified_count
+
+
+def rollup_table(table):
+    return f"{table}_rollup"
+
+
+def ensure_rollup_state_table(cursor):
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {rollup_state_table} (
+        table_name VARCHAR(64) PRIMARY KEY,
+        last_local_id BIGINT NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """)
+
+
+def ensure_rollup(cursor, table, rebuild=False):
+    # Key columns are VARCHAR(191) so the primary key stays under InnoDB's limit
+    key_definitions = ", ".join(f"{col} VARCHAR(191) NOT NULL" for col in rollup_keys)
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {rollup_table(table)} (
+        day DATE NOT NULL,
+        {flag_column} TINYINT NOT NULL,
+        {key_definitions},
+        movements BIGINT NOT NULL,
+        first_time DATETIME NULL,
+        last_time DATETIME NULL,
+        PRIMARY KEY (day, {flag_column}, {", ".join(rollup_keys)}),
+        KEY idx_{flag_column}_day ({flag_column}, day)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """)
+    if rebuild:
+        # Flags changed under existing aggregates, fold every row in again
+        print(f"ℹ️ Rebuilding {rollup_table(table)}...")
+        cursor.execute(f"DELETE FROM {rollup_table(table)}")
+        cursor.execute(f"DELETE FROM {rollup_state_table} WHERE table_name = %s", (table,))
+        bump_data_version(cursor, table)
+
+
+def update_rollup(cursor, table):
+    # Folds rows with a local_id above the stored position into the rollup,
+    # in the caller's transaction so it commits together with those rows.
+    # retire_old_partitions() takes retired months back out, so the rollup
+    # and a rebuild of it only ever count rows still in the mirror.
+    cursor.execute(f"SELECT last_local_id FROM {rollup_state_table} WHERE table_name = %s", (table,))
+    row = cursor.fetchone()
+    position = row[0] if row else 0
+    cursor.execute(f"SELECT MAX(local_id) FROM {table}")
+    newest = cursor.fetchone()[0]
+    if newest is None or newest <= position:
+        return 0
+    keys = ", ".join(f"COALESCE(LEFT({col}, 191), '')" for col in rollup_keys)
+    ts = f"NULLIF({sync_time_column}, '{null_timestamp}')"
+    cursor.execute(f"""
+    INSERT INTO {rollup_table(table)}
+        (day, {flag_column}, {", ".join(rollup_keys)}, movements, first_time, last_time)
+    SELECT COALESCE(DATE({ts}), %s), COALESCE({flag_column}, 0), {keys},
+           COUNT(*), MIN({ts}), MAX({ts})
+    FROM {table}
+    WHERE local_id > %s AND local_id <= %s
+    GROUP BY 1, 2, {", ".join(str(i) for i in range(3, 3 + len(rollup_keys)))}
+    ON DUPLICATE KEY UPDATE
+        movements = movements + VALUES(movements),
+        first_time = LEAST(COALESCE(first_time, VALUES(first_time)), COALESCE(VALUES(first_time), first_time)),
+        last_time = GREATEST(COALESCE(last_time, VALUES(last_time)), COALESCE(VALUES(last_time), last_time))
+    """, (rollup_null_day, position, newest))
+    folded = cursor.rowcount
+    cursor.execute(f"""
+    INSERT INTO {rollup_state_table} (table_name, last_local_id) VALUES (%s, %s)
+    ON DUPLICATE KEY UPDATE last_local_id = VALUES(last_local_id)
+    """, (table, newest))
+    return folded
+
+
+def period_start(year, month):
+    return datetime(year, 1, 1) if partition_by == "year" else datetime(year, month, 1)
+
+
+def next_period(start):
+    if partition_by == "year":
+        return datetime(start.year + 1, 1, 1)
+    return datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+
+def partition_name(start):
+    return f"p{start:%Y}" if partition_by == "year" else f"p{start:%Y%m}"
+
+
+def initial_partitions_sql():
+    # Period partitions are carved out of p_future as data for them arrives
+    return f"""
+    PARTITION BY RANGE COLUMNS({sync_time_column}) (
+        PARTITION p_start VALUES LESS THAN ('1970-01-01 00:00:00'),
+        PARTITION p_future VALUES LESS THAN (MAXVALUE)
+    )"""
+
+
+def table_partitions(cursor, table):
+    # [(name, upper bound or None for MAXVALUE)] in partition order
+    cursor.execute(
+        "SELECT PARTITION_NAME, PARTITION_DESCRIPTION FROM INFORMATION_SCHEMA.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL "
+        "ORDER BY PARTITION_ORDINAL_POSITION",
+        (table,)
+    )
+    parts = []
+    for name, bound in cursor.fetchall():
+        bound = None if bound == "MAXVALUE" else datetime.fromisoformat(bound.strip("'"))
+        parts.append((name, bound))
+    return parts
+
+
+def ensure_partitions(cursor, table, periods):
+    # Splits p_future so every period up to the newest one in this chunk has
+    # its own partition. Older periods already fall into an existing one.
+    needed = [period_start(y, m) for y, m in periods if y > 0]
+    if not needed:
+        return
+    parts = table_partitions(cursor, table)
+    bounds = [bound for _, bound in parts if bound is not None]
+    last_bound = max(bounds)
+    newest = max(needed)
+    if newest < last_bound:
+        return
+    # The first carve starts at the oldest period seen instead of 1970,
+    # later ones continue from the last bound without gaps.
+    start = min(needed) if len(bounds) == 1 else last_bound
+    new_parts = []
+    while start <= newest:
+        end = next_period(start)
+        new_parts.append(f"PARTITION {partition_name(start)} VALUES LESS THAN ('{end:%Y-%m-%d %H:%M:%S}')")
+        start = end
+    new_parts.append("PARTITION p_future VALUES LESS THAN (MAXVALUE)")
+    cursor.execute(f"ALTER TABLE {table} REORGANIZE PARTITION p_future INTO ({', '.join(new_parts)})")
+    print(f"[{table}] ✅ Added {len(new_parts) - 1} partitions up to {partition_name(newest)}.", flush=True)
+
+
+def retire_old_partitions(cursor, table):
+    # Dropping or exchanging a partition is a metadata change, no row-by-row delete
+    if not partition_retention:
+        return
+    parts = table_partitions(cursor, table)
+    # (name, lower bound, upper bound) of every period partition
+    period_parts = [(name, parts[i - 1][1], bound) for i, (name, bound) in enumerate(parts)
+                    if bound is not None and name != "p_start"]
+    has_rollup = table_exists(cursor, rollup_table(table))
+    for name, lower, upper in period_parts[:-partition_retention]:
+        if archive_partitions:
+            archive = f"{table}_{name}"
+            if table_exists(cursor, archive):
+                # Exchanging would swap the old archive's rows back in
+                print(f"[{table}] ⚠️ {archive} already exists, partition {name} kept.", flush=True)
+                continue
+            cursor.execute(f"CREATE TABLE {archive} LIKE {table}")
+            cursor.execute(f"ALTER TABLE {archive} REMOVE PARTITIONING")
+            cursor.execute(f"ALTER TABLE {table} EXCHANGE PARTITION {name} WITH TABLE {archive}")
+        cursor.execute(f"ALTER TABLE {table} DROP PARTITION {name}")
+        if has_rollup:
+            cursor.execute(
+                f"DELETE FROM {rollup_table(table)} WHERE day >= %s AND day < %s",
+                (lower, upper)
+            )
+        bump_data_version(cursor, table)
+        action = f"archived to {table}_{name}" if archive_partitions else "dropped"
+        print(f"[{table}] ℹ️ Partition {name} {action}.", flush=True)
+
+
+def as_datetime(value):
+    # Remote timestamps arrive as datetime for DATETIME columns and as text otherwise
+    if isinstance(value, datetime) or value is None:
+        return value
+    try:
+        return datetime.fromisoformat(str(value).strip())
+    except ValueError:
+        return None
+
+
+def chunk_high_water(rows, time_idx, tiebreak_idx):
+    keys = []
+    for row in rows:
+        ts = as_datetime(row[time_idx])
+        if ts is not None:
+            keys.append((ts, "" if row[tiebreak_idx] is None else str(row[tiebreak_idx])))
+    return max(keys) if keys else None
+
+
+def chunk_periods(rows, time_idx):
+    # (year, month) partitions touched by a chunk, (0, 0) holds rows without a timestamp
+    periods = set()
+    for row in rows:
+        ts = as_datetime(row[time_idx])
+        periods.add((ts.year, ts.month) if ts is not None else (0, 0))
+    return periods
+
+
+def with_null_times(rows, time_idx):
+    # Partitioned mirrors: a missing (or unparsable) timestamp becomes
+    # null_timestamp instead of the zero date INSERT IGNORE would store
+    null_time = datetime.fromisoformat(null_timestamp)
+    return [(*row[:time_idx], as_datetime(row[time_idx]) or null_time, *row[time_idx + 1:]) for row in rows]
+
+
+def repair_zero_times(cursor, table):
+    # Partitioned mirrors synced before null_timestamp hold those rows at
+    # 0000-00-00 00:00:00, which is the only value below it
+    cursor.execute(
+        f"UPDATE {table} SET {sync_time_column} = %s WHERE {sync_time_column} < %s",
+        (null_timestamp, null_timestamp)
+    )
+    return max(cursor.rowcount, 0)
+
+
+def all_periods(cursor, table, since=None):
+    where, params = "", ()
+    if since is not None:
+        where, params = f" WHERE {sync_time_column} >= %s", (since,)
+    ts = f"NULLIF({sync_time_column}, '{null_timestamp}')"
+    cursor.execute(
+        f"SELECT DISTINCT COALESCE(YEAR({ts}), 0), COALESCE(MONTH({ts}), 0) FROM {table}{where}",
+        params
+    )
+    return {(int(y), int(m)) for y, m in cursor.fetchall()}
+
+
+def arrow_type(col_type):
+    # Fixed per-column types so every partition file shares one schema,
+    # even when a column happens to be all NULL in some month.
+    base = col_type.split("(")[0].replace(" unsigned", "")
+    if base in ("tinyint", "smallint", "mediumint", "int", "integer", "bigint", "year"):
+        return pa.int64()
+    if base in ("float", "double", "real"):
+        return pa.float64()
+    if base in ("decimal", "numeric"):
+        precision, _, scale = col_type.split("(")[1].rstrip(")").partition(",")
+        return pa.decimal128(int(precision), int(scale or 0))
+    if base in ("datetime", "timestamp"):
+        return pa.timestamp("us")
+    if base == "date":
+        return pa.date32()
+    if base.endswith("blob") or base in ("binary", "varbinary"):
+        return pa.binary()
+    return pa.string()
+
+
+def arrow_chunk(rows, schema):
+    columns = list(zip(*rows))
+    if sync_time_column in schema.names:
+        # Legacy mirrors still hold the timestamp as TEXT
+        time_idx = schema.names.index(sync_time_column)
+        null_time = datetime.fromisoformat(null_timestamp)
+        columns[time_idx] = [None if ts == null_time else ts
+                             for ts in map(as_datetime, columns[time_idx])]
+    return pa.Table.from_arrays(
+        [pa.array(values, type=field.type) for field, values in zip(schema, columns)],
+        schema=schema
+    )
+
+
+def export_partition(local_conn, table, schema, year, month):
+    # Streams the month through an unbuffered cursor, one row group per
+    # stream_chunk_size rows, so memory does not grow with the month's size
+    if year == 0:
+        where, params = f"({sync_time_column} IS NULL OR {sync_time_column} = %s)", (null_timestamp,)
+    else:
+        start = datetime(year, month, 1)
+        end = datetime(year + month // 12, month % 12 + 1, 1)
+        where, params = f"{sync_time_column} >= %s AND {sync_time_column} < %s", (start, end)
+    part_dir = os.path.join(parquet_dir, table, f"year={year}", f"month={month}")
+    part_file = os.path.join(part_dir, "part-0.parquet")
+    # Written next to the target and swapped in, readers never see half a file
+    tmp_file = part_file + ".tmp"
+
+    cursor = local_conn.cursor(buffered=False)
+    cursor.execute(f"SELECT {', '.join(schema.names)} FROM {table} WHERE {where}", params)
+    writer = None
+    exported = 0
+    try:
+        for rows in fetch_chunks(cursor, stream_chunk_size):
+            if writer is None:
+                os.makedirs(part_dir, exist_ok=True)
+                writer = pq.ParquetWriter(tmp_file, schema)
+            writer.write_table(arrow_chunk(rows, schema))
+            exported += len(rows)
+    except Exception:
+        if writer is not None:
+            writer.close()
+            os.remove(tmp_file)
+        raise
+    cursor.close()
+
+    if writer is None:
+        if os.path.exists(part_file):
+            os.remove(part_file)
+        return 0
+    writer.close()
+    os.replace(tmp_file, part_file)
+    return exported
+
+
+def export_table(local_conn, table, columns, periods=None):
+    # Rewrites only the partitions touched by this sync, or all of them
+    # when the dataset does not exist yet.
+    cursor = local_conn.cursor(buffered=True)
+    if not os.path.isdir(os.path.join(parquet_dir, table)):
+        periods = None
+    if periods is None:
+        periods = all_periods(cursor, table)
+    types = column_types(cursor, table)
+    cursor.close()
+    # sync_time_column is always written as a timestamp, whatever the mirror stores,
+    # so the dashboard can filter it against datetimes
+    schema = pa.schema([(col, pa.timestamp("us") if col == sync_time_column else arrow_type(types[col]))
+                        for col in columns])
+    exported = 0
+    for year, month in sorted(periods):
+        exported += export_partition(local_conn, table, schema, year, month)
+    return len(periods), exported
+
+
+def connect_remote():
+    return mysql.connector.connect(
         host=remote_host,
         user=remote_user,
         password=remote_password,
         database=remote_db
     )
 
-    if remote_conn.is_connected():
-        print("✅ Connected to remote DB.")
-        remote_cursor = remote_conn.cursor()
-        remote_cursor.execute(f"SELECT * FROM {table_name};")
-        rows = remote_cursor.fetchall()
-        columns = [i[0] for i in remote_cursor.description]
 
-    # Connect to local MySQL server
-    local_conn = mysql.connector.connect(
+def connect_local(use_database=True):
+    # local_db is read at call time so callers (e.g. Benchmark.py) can repoint it
+    return mysql.connector.connect(
         host=local_host,
         user=local_user,
-        password=local_password
+        password=local_password,
+        database=local_db if use_database else None
     )
-    local_cursor = local_conn.cursor()
 
-    # Create local database if it doesn't exist
-    local_cursor.execute(f"CREATE DATABASE IF NOT EXISTS {local_db};")
-    local_conn.commit()
+
+# One remote/local connection pair per worker thread, reused across tables
+_worker = threading.local()
+_opened_pairs = []
+_opened_lock = threading.Lock()
+
+
+def worker_connections():
+    pair = getattr(_worker, "pair", None)
+    if pair is None or not (pair[0].is_connected() and pair[1].is_connected()):
+        pair = (connect_remote(), connect_local())
+        _worker.pair = pair
+        with _opened_lock:
+            _opened_pairs.append(pair)
+    return pair
+
+
+def drop_worker_connections():
+    # After a failure the remote side may still hold an unread result set
+    pair = getattr(_worker, "pair", None)
+    _worker.pair = None
+    if pair is not None:
+        for conn in pair:
+            try:
+                conn.close()
+            except mysql.connector.Error:
+                pass
+
+
+def close_all_connections():
+    with _opened_lock:
+        for pair in _opened_pairs:
+            for conn in pair:
+                if conn.is_connected():
+                    conn.close()
+        _opened_pairs.clear()
+
+
+def prepare_local_db():
+    # Database, sync state and version tables are shared by all workers, create them once
+    conn = connect_local(use_database=False)
+    cursor = conn.cursor()
+    cursor.execute(f"CREATE DATABASE IF NOT EXISTS {local_db};")
     print(f"✅ Local database '{local_db}' ensured.")
+    conn.database = local_db
+    if incremental or resumable:
+        ensure_state_table(cursor)
+    if maintain_rollups:
+        ensure_rollup_state_table(cursor)
+    ensure_version_table(cursor)
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+
+def snapshot_list():
+    if snapshot_tables:
+        return list(snapshot_tables)
+    if not discover_snapshots:
+        return [table_name]
+    conn = connect_remote()
+    cursor = conn.cursor()
+    cursor.execute("SHOW TABLES LIKE %s", (snapshot_pattern,))
+    tables = sorted(row[0] for row in cursor.fetchall())
+    cursor.close()
+    conn.close()
+    print(f"ℹ️ Found {len(tables)} remote tables matching '{snapshot_pattern}'.")
+    return tables
+
+
+def dump_table(table, remote_conn, local_conn):
+    def say(message):
+        print(f"[{table}] {message}", flush=True)
+
+    setup_start = time.perf_counter()
+    local_cursor = local_conn.cursor(buffered=True)
 
-    # Switch to local database
-    local_conn.database = local_db
+    # Last synced high-water mark (None -> full copy), or the checkpoint of
+    # an interrupted run that we resume from
+    state = None
+    if incremental or resumable:
+        state = load_sync_state(local_cursor, table)
+    resuming = resumable and state is not None and state["status"] == "running"
+    since = None
+    restart_from = None
+    if resuming and not state["checkpointed"]:
+        # Died before its first chunk committed: run it again from its start
+        restart_from = state["run_from"]
+        say(f"ℹ️ Resuming interrupted sync from its start, {sync_time_column} >= "
+            f"{restart_from if restart_from else 'start of table'}.")
+    elif resuming:
+        since = state["since"]
+        say(f"ℹ️ Resuming interrupted sync from checkpoint {sync_time_column} = "
+            f"{since[0] if since else 'start of table'}.")
+    elif incremental and state is not None and state["since"] is not None:
+        since = state["since"]
+        say(f"ℹ️ Incremental sync from {sync_time_column} = {since[0]} "
+            f"(overlap {sync_overlap_minutes} min).")
+    else:
+        say("ℹ️ No sync state yet, copying the full table.")
+
+    remote_cursor = remote_conn.cursor(buffered=True)
+    remote_cursor.execute(f"SELECT * FROM {table} LIMIT 0;")
+    columns = [i[0] for i in remote_cursor.description]
+
+    # Column types are only needed when the local mirror is created
+    local_types = {}
+    creating = not table_exists(local_cursor, table)
+    if creating:
+        local_types = infer_local_types(remote_cursor, table)
+    remote_cursor.close()
+
+    # Partitioning is decided at creation time; every unique key of a
+    # partitioned table has to include the partitioning column.
+    if creating:
+        partitioned = partition_by is not None and sync_time_column in columns
+    else:
+        partitioned = len(table_partitions(local_cursor, table)) > 1
+        if partition_by is not None and not partitioned:
+            say("⚠️ Existing mirror is not partitioned, rebuild it to enable partition_by.")
+    if creating and partitioned:
+        local_types[sync_time_column] = "datetime"
+        key_definitions = (f"PRIMARY KEY (local_id, {sync_time_column}),\n"
+                           f"        UNIQUE KEY uniq_{hash_column} ({hash_column}, {sync_time_column})")
+        partition_clause = initial_partitions_sql()
+    else:
+        key_definitions = (f"PRIMARY KEY (local_id),\n"
+                           f"        UNIQUE KEY uniq_{hash_column} ({hash_column})")
+        partition_clause = ""
+
+    track_high_water = (incremental or resumable) and sync_time_column in columns \
+        and sync_tiebreak_column in columns
+    if (incremental or resumable) and not track_high_water:
+        say(f"⚠️ '{sync_time_column}'/'{sync_tiebreak_column}' not found, sync state will not be saved.")
+    checkpointing = resumable and track_high_water
 
     # Create table
-    column_definitions = ", ".join([f"{col} TEXT" for col in columns])
+    column_definitions = ", ".join([f"{col} {local_types.get(col, 'TEXT')}" for col in columns])
+    if classify_rows:
+        column_definitions += f", {flag_column} TINYINT NULL, {keyword_column} VARCHAR(64) NULL"
     create_table_sql = f"""
-    CREATE TABLE IF NOT EXISTS {table_name} (
-        local_id INT AUTO_INCREMENT PRIMARY KEY,
-        {column_definitions}
-    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    CREATE TABLE IF NOT EXISTS {table} (
+        local_id INT AUTO_INCREMENT,
+        {column_definitions},
+        {hash_column} BINARY(16) NOT NULL,
+        {key_definitions}
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4{partition_clause};
     """
     local_cursor.execute(create_table_sql)
     local_conn.commit()
-    print(f"✅ Local table '{table_name}' ensured.")
+    say("✅ Local table ensured.")
 
-    # 🔹 ADD UNIQUE INDEX TO PREVENT DUPLICATES (SAFE)
-    unique_cols = ", ".join(columns)
-    create_unique_index_sql = f"""
-    CREATE UNIQUE INDEX IF NOT EXISTS uniq_{table_name}
-    ON {table_name} ({unique_cols});
-    """
-    try:
-        local_cursor.execute(create_unique_index_sql)
+    # Secondary indexes used by the dashboard filters
+    ensure_indexes(local_cursor, table)
+    local_conn.commit()
+
+    # Dedup key for mirrors created before the row hash existed
+    ensure_row_hash(local_cursor, table, columns)
+    local_conn.commit()
+
+    # Rows without a timestamp stored as zero dates before null_timestamp
+    repaired = 0
+    if partitioned and not creating:
+        repaired = repair_zero_times(local_cursor, table)
+        if repaired:
+            bump_data_version(local_cursor, table)
+            say(f"✅ {repaired} rows without {sync_time_column} moved to {null_timestamp}.")
         local_conn.commit()
-        print("✅ Unique index ensured (duplicates prevention enabled).")
-    except mysql.connector.Error:
-        pass  # index already exists
 
-    # Insert rows (IGNORE duplicates)
+    # Military flag column, backfilled for rows synced before it existed
+    backfilled = 0
+    if classify_rows:
+        targets = rule_targets(local_cursor, table, columns)
+        backfilled = ensure_classification(local_conn, local_cursor, table, columns, targets)
+
+    # Dashboard rollup, caught up with rows mirrored before it existed
+    rolling_up = maintain_rollups and classify_rows and sync_time_column in columns \
+        and all(col in columns for col in rollup_keys)
+    if maintain_rollups and not rolling_up:
+        say("⚠️ Rollup columns not found, rollup will not be maintained.")
+    if rolling_up:
+        ensure_rollup(local_cursor, table, rebuild=backfilled > 0 or repaired > 0)
+        if update_rollup(local_cursor, table):
+            say(f"✅ {rollup_table(table)} caught up.")
+        local_conn.commit()
+
+    # Local schema is ready, only now start pulling rows
+    remote_cursor = remote_conn.cursor(buffered=False)
+    if stream_rows:
+        # The server drops a streaming client that stops reading for longer
+        # than net_write_timeout, give the local writer room between chunks.
+        remote_cursor.execute("SET SESSION net_write_timeout = 600;")
+    select_sql, select_params = build_select(table, since, keyset=resuming, ordered=checkpointing,
+                                               start=restart_from)
+    remote_cursor.execute(select_sql, select_params)
+    if stream_rows:
+        chunks = fetch_chunks(remote_cursor, stream_chunk_size)
+    else:
+        chunks = [remote_cursor.fetchall()]
+
+    # Insert rows in batches (IGNORE duplicates)
     inserted_count = 0
-    for row in rows:
-        placeholders = ", ".join(["%s"] * len(row))
-        columns_str = ", ".join(columns)
-        sql = f"""
-        INSERT IGNORE INTO {table_name} ({columns_str})
-        VALUES ({placeholders})
-        """
-        local_cursor.execute(sql, row)
-        inserted_count += local_cursor.rowcount
+    total_rows = 0
+    high_water = since
+    insert_columns = columns + [hash_column]
+    export_columns = list(columns)
+    if classify_rows:
+        insert_columns += [flag_column, keyword_column]
+        export_columns += [flag_column, keyword_column]
+    can_export = export_parquet and sync_time_column in columns
+    if export_parquet and pa is None:
+        say("⚠️ pyarrow is not installed, skipping Parquet export.")
+        can_export = False
+    touched = set()
+    if checkpointing:
+        if resuming:
+            run_from = state["run_from"]
+            if can_export:
+                # Partitions the interrupted part of the run already wrote to
+                touched |= all_periods(local_cursor, table, since=run_from)
+        else:
+            run_from = run_start(since)
+        mark_sync_running(local_cursor, table, run_from, fresh=not resuming)
+        local_conn.commit()
+
+    start = time.perf_counter()
+    setup_seconds = start - setup_start
+    for rows in chunks:
+        periods = set()
+        if partitioned or can_export:
+            periods = chunk_periods(rows, columns.index(sync_time_column))
+        if partitioned:
+            # DDL commits implicitly, so do it before the chunk's rows go in
+            ensure_partitions(local_cursor, table, periods)
+        chunk_inserted = 0
+        for i in range(0, len(rows), batch_size):
+            batch = rows[i:i + batch_size]
+            batch = classified(batch, targets) if classify_rows else with_row_hash(batch)
+            if partitioned:
+                batch = with_null_times(batch, columns.index(sync_time_column))
+            chunk_inserted += insert_batch(local_cursor, table, insert_columns, batch)
+        inserted_count += chunk_inserted
+        total_rows += len(rows)
+        if chunk_inserted:
+            bump_data_version(local_cursor, table)
+        if rolling_up and chunk_inserted:
+            update_rollup(local_cursor, table)
+        if track_high_water:
+            chunk_max = chunk_high_water(
+                rows, columns.index(sync_time_column), columns.index(sync_tiebreak_column)
+            )
+            if chunk_max is not None and (high_water is None or chunk_max > high_water):
+                high_water = chunk_max
+        if can_export:
+            touched |= periods
+        if checkpointing:
+            # Rows are read in key order, so the chunk's last key is the resume
+            # point. It commits together with the chunk's rows.
+            save_sync_state(local_cursor, table, chunk_max, chunk_inserted, status="running")
+            local_conn.commit()
+        if stream_rows:
+            say(f"ℹ️ {total_rows} rows copied so far...")
+    remote_cursor.close()
+
+    # Saved in the same transaction as the rows it describes
+    if track_high_water:
+        rows_left = 0 if checkpointing else inserted_count
+        save_sync_state(local_cursor, table, high_water, rows_left, status="done")
+        if high_water is not None:
+            say(f"ℹ️ Sync high-water mark: {sync_time_column} = {high_water[0]}.")
 
     local_conn.commit()
-    print(f"✅ {inserted_count} NEW rows inserted (duplicates ignored).")
-
-except mysql.connector.Error as err:
-    print("❌ MySQL error:", err)
-
-finally:
-    if 'remote_conn' in locals() and remote_conn.is_connected():
-        remote_cursor.close()
-        remote_conn.close()
-    if 'local_conn' in locals() and local_conn.is_connected():
-        local_cursor.close()
-        local_conn.close()
-    print("ℹ️ Connections closed.")
+    elapsed = time.perf_counter() - start
+    rate = total_rows / elapsed if elapsed > 0 else 0
+    say(f"✅ {inserted_count} NEW rows inserted (duplicates ignored).")
+    say(f"ℹ️ Loaded {total_rows} rows in {elapsed:.1f}s ({rate:,.0f} rows/s, batch size {batch_size}).")
+
+    if partitioned:
+        retire_old_partitions(local_cursor, table)
+        local_conn.commit()
+
+    export_seconds = 0.0
+    if can_export:
+        export_start = time.perf_counter()
+        # Backfilled flags (or repaired timestamps) changed partitions beyond the touched ones
+        periods = None if backfilled or repaired else touched
+        parts, exported = export_table(local_conn, table, export_columns, periods)
+        export_seconds = time.perf_counter() - export_start
+        say(f"✅ Parquet: {parts} partitions ({exported} rows) written in {export_seconds:.1f}s.")
+    local_cursor.close()
+    return {
+        "rows": total_rows,
+        "inserted": inserted_count,
+        "phases": {"setup": setup_seconds, "copy": elapsed, "export": export_seconds}
+    }
+
+
+def run_dump_table(table):
+    start = time.perf_counter()
+    result = {"table": table, "status": "ok", "rows": 0, "inserted": 0}
+    try:
+        remote_conn, local_conn = worker_connections()
+        result.update(dump_table(table, remote_conn, local_conn))
+    except mysql.connector.Error as err:
+        print(f"[{table}] ❌ MySQL error:", err, flush=True)
+        result.update(status="failed", error=f"MySQL error: {err}")
+        drop_worker_connections()
+    except Exception as err:
+        # e.g. a Parquet conversion/write error: fail this table, not the run
+        print(f"[{table}] ❌ {type(err).__name__}:", err, flush=True)
+        result.update(status="failed", error=f"{type(err).__name__}: {err}")
+        drop_worker_connections()
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def print_summary(results, elapsed):
+    print("\n" + "-" * 86)
+    print(f"{'Table':<40}{'Status':>8}{'Rows':>12}{'Inserted':>12}{'Seconds':>9}")
+    print("-" * 86)
+    for r in sorted(results, key=lambda r: r["table"]):
+        print(f"{r['table']:<40}{r['status']:>8}{r['rows']:>12}{r['inserted']:>12}{r['seconds']:>9.1f}")
+    print("-" * 86)
+    total_rows = sum(r["rows"] for r in results)
+    total_inserted = sum(r["inserted"] for r in results)
+    failed = sum(r["status"] != "ok" for r in results)
+    for r in sorted(results, key=lambda r: r["table"]):
+        if "error" in r:
+            print(f"❌ {r['table']}: {r['error']}")
+    rate = total_rows / elapsed if elapsed > 0 else 0
+    print(f"ℹ️ {len(results)} tables, {failed} failed, {total_rows} rows read, "
+          f"{total_inserted} inserted in {elapsed:.1f}s ({rate:,.0f} rows/s).")
+
+
+def main():
+    start = time.perf_counter()
+    results = []
+    try:
+        prepare_local_db()
+        tables = snapshot_list()
+        workers = max(1, min(max_workers, len(tables)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_dump_table, table) for table in tables]
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                print(f"ℹ️ [{len(results)}/{len(tables)}] {result['table']} {result['status']} "
+                      f"in {result['seconds']:.1f}s.", flush=True)
+
+    except mysql.connector.Error as err:
+        print("❌ MySQL error:", err)
+
+    finally:
+        close_all_connections()
+        print("ℹ️ Connections closed.")
+
+    if results:
+        print_summary(results, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
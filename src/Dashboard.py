@@ -1,11 +1,31 @@
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import math   # added for bearing calculation in map arrows
-from dash import Dash, dcc, html, dash_table, Input, Output, State
+from plotly.io.json import to_json_plotly
+import os
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from dash import Dash, dcc, html, dash_table, Input, Output, State, ctx, no_update
+from dash.exceptions import PreventUpdate
 import mysql.connector
 import warnings
 import logging
+from Classifier import TEXT_TYPES, military_matches, rule_columns
+from Mirror_Schema import flag_column, keyword_column, null_timestamp, parquet_dir, rollup_null_day, version_table
+from Jobs import cancel, job_info, job_status, submit
+from Station_Index import attach_coordinates, index_info, station_index
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # only needed for the "parquet" backend
+    pa = ds = pq = None
 
 warnings.filterwarnings(
     "ignore",
@@ -24,63 +44,609 @@ local_password = "admin"
 local_db = "in_railin_local"
 table_name = "rail_rem_rake_20251126100147"
 
+# ---------------------------
+# Data backend: "mysql" reads the local mirror, "parquet" reads the
+# year/month partitioned snapshot DB_Dump.py writes to parquet_dir
+# (Mirror_Schema.py)
+# ---------------------------
+data_backend = "mysql"
+
+# ---------------------------
+# Declared schema: columns each dashboard view loads, and their dtypes.
+# DB_Dump.py stores the military classification per row (flag_column,
+# keyword_column), so only flagged rows are read. Mirrors synced before
+# that are classified here instead, which needs the text columns it scans;
+# None means every text column the rules in Classifier.py look at
+# (numbers and dates can never contain a keyword).
+# "category" columns are stripped/upper-cased once at load and coded
+# against categories shared by every request (see shared_categorical).
+# ---------------------------
+DASHBOARD_VIEWS = {
+    "military": ["RADSTTSCHNGTIME", "RAVRAKENAME", "RAVSTTNFROM", "RAVSRVGSTTN"],
+}
+COLUMN_DTYPES = {
+    "RAVRAKENAME": "category",
+    "RAVSTTNFROM": "category",
+    "RAVSRVGSTTN": "category",
+}
+military_scan_columns = None
+timestamp_format = "%Y-%m-%d %H:%M:%S"  # RADSTTSCHNGTIME as stored by mirrors that still hold it as TEXT
+map_top_routes = 1000  # busiest From → To routes drawn on the map
+
+# ---------------------------
+# load_data cache: results are reused until the data-version token of the
+# source (DB_Dump's version row, UPDATE_TIME and max local_id, or the
+# Parquet file mtimes) changes. Least recently used entries go first once
+# max_mb is exceeded.
+# ---------------------------
+cache_enabled = True
+cache_ttl_seconds = 600
+cache_max_mb = 512
+version_check_seconds = 5  # the token itself is re-read at most this often
+
+# ---------------------------
+# Rollups: when DB_Dump.py maintains <table>_rollup, the military view is
+# read from those per-day aggregates instead of raw rows (MySQL backend)
+# ---------------------------
+use_rollups = True
+
+# ---------------------------
+# MySQL connection pool shared by all dashboard queries
+# ---------------------------
+pool_size = 5
+pool_timeout_seconds = 10  # wait this long for a free connection, then fail the request
+
+# ---------------------------
+# Server-side datasets: Apply Filter computes the filtered military frame
+# once and keeps it here; the browser only gets its key (dcc.Store
+# "dataset-key"). Every panel has its own callback on that key, so panels
+# render as they finish and a panel's own options only redraw that panel.
+# ---------------------------
+dataset_slots = 16  # most recently used filtered frames kept
+
+# ---------------------------
+# Panel cache: finished figures and table rows, kept as the JSON Dash
+# sends to the browser and keyed by dataset key (backend, year, month,
+# data version) plus the panel's options. Least recently used entries go
+# first once panel_cache_max_mb is exceeded; a new data version means new
+# keys, so stale panels simply age out.
+# ---------------------------
+panel_cache_enabled = True
+panel_cache_max_mb = 64
+
+# ---------------------------
+# Background refresh: Apply Filter runs loading, classification and the
+# panels as a job (Jobs.py) instead of on the request thread; the page
+# polls its progress every job_poll_ms and can cancel it
+# ---------------------------
+job_poll_ms = 500
+TARGET_RAKE = "DRDO/SPL"
+
 # ────────────────────────────────────────────────
 # Station coordinates — loaded once when app starts
+# (CSV path and its binary cache are set in Station_Index.py)
 # ────────────────────────────────────────────────
-try:
-    STATION_COORDS = pd.read_csv(
-        r"C:\Users\Baloch\PycharmProjects\Dashboard\src\indian_stations.csv"
-    )
-    # Keep only needed columns and index by code
-    STATION_COORDS = STATION_COORDS[["StationCode", "Latitude", "Longitude"]].set_index("StationCode").to_dict(
-        orient="index")
-    print(f"→ Loaded {len(STATION_COORDS)} Indian railway stations with coordinates")
-except Exception as e:
-    print("Warning: Could not load indian_stations.csv → map will be empty", e)
-    STATION_COORDS = {}
+station_index()
 
 
 # ---------------------------
-# Load dataset from MySQL (extended safely)
+# Filters → query bounds, and the sources load_data() reads from
 # ---------------------------
-def load_data(selected_year=None):
+def time_range(selected_year=None, selected_month=None, start_date=None, end_date=None):
+    # Year/month become a half-open [lower, upper) range on RADSTTSCHNGTIME so
+    # the database can range-scan its index and prune partitions.
+    # end_date is inclusive (whole day).
+    lower, upper = None, None
+    if selected_year is not None:
+        lower = pd.Timestamp(year=selected_year, month=selected_month or 1, day=1)
+        upper = lower + (pd.DateOffset(months=1) if selected_month else pd.DateOffset(years=1))
+    if start_date is not None:
+        start = pd.Timestamp(start_date)
+        lower = start if lower is None else max(lower, start)
+    if end_date is not None:
+        end = pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1)
+        upper = end if upper is None else min(upper, end)
+    return lower, upper
+
+
+def parquet_filters(lower=None, upper=None, month=None, flagged_only=False):
+    filters = []
+    if flagged_only:
+        filters.append((flag_column, "=", 1))
+    # Snapshots exported before DB_Dump.py always wrote a timestamp may hold
+    # RADSTTSCHNGTIME as text, compared as timestamp_format strings
+    if parquet_time_is_timestamp():
+        bound = lambda ts: ts.to_pydatetime()
+    else:
+        bound = lambda ts: ts.strftime(timestamp_format)
+    if lower is not None:
+        filters += [("year", ">=", lower.year), ("RADSTTSCHNGTIME", ">=", bound(lower))]
+    if upper is not None:
+        # upper is exclusive: a whole-year range ends in that year, not on 1 January of the next
+        last_year = (upper - pd.Timedelta(microseconds=1)).year
+        filters += [("year", "<=", last_year), ("RADSTTSCHNGTIME", "<", bound(upper))]
+    if month is not None:
+        filters.append(("month", "=", month))
+    return filters
+
+
+def read_parquet_snapshot(lower=None, upper=None, month=None, columns=None, flagged_only=False):
+    # Only the year=/month= partition directories that can match are opened,
+    # and the files are memory-mapped instead of read into Python buffers.
+    filters = parquet_filters(lower, upper, month, flagged_only)
+    table = pq.read_table(
+        os.path.join(parquet_dir, table_name),
+        columns=columns,
+        filters=filters or None,
+        memory_map=True
+    )
+    df = table.to_pandas()
+    return df.drop(columns=["year", "month"], errors="ignore")
+
+
+def count_parquet_rows(lower=None, upper=None, month=None):
+    # Same pruning as read_parquet_snapshot, but no column is materialized:
+    # unfiltered row groups are counted from their metadata
+    filters = parquet_filters(lower, upper, month)
+    dataset = ds.dataset(os.path.join(parquet_dir, table_name), format="parquet", partitioning="hive")
+    return dataset.count_rows(filter=pq.filters_to_expression(filters) if filters else None)
+
+
+# Per backend: (all column names, text columns), read from the schema once
+_source_columns = {}
+
+
+def mysql_source_columns(conn):
+    if "mysql" not in _source_columns:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT COLUMN_NAME, DATA_TYPE FROM INFORMATION_SCHEMA.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s ORDER BY ORDINAL_POSITION",
+            (table_name,)
+        )
+        rows = cursor.fetchall()
+        _source_columns["mysql"] = (
+            [name for name, _ in rows],
+            [name for name, data_type in rows
+             if data_type.lower() in TEXT_TYPES and name != keyword_column]
+        )
+        cursor.close()
+    return _source_columns["mysql"]
+
+
+def rollup_available(conn):
+    if "mysql_rollup" not in _source_columns:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT COUNT(*) FROM INFORMATION_SCHEMA.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+            (f"{table_name}_rollup",)
+        )
+        _source_columns["mysql_rollup"] = cursor.fetchone()[0] > 0
+        cursor.close()
+    return _source_columns["mysql_rollup"]
+
+
+def read_rollup(conn, lower=None, upper=None, month=None):
+    # Year/month/date bounds all fall on midnight, so they filter whole days.
+    # Rows come back shaped like raw rows plus Movements/First_Time/Last_Time.
+    rollup = f"{table_name}_rollup"
+    conditions, params = [], []
+    if lower is not None or upper is not None or month is not None:
+        conditions.append("day > %s")
+        params.append(rollup_null_day)
+    if lower is not None:
+        conditions.append("day >= %s")
+        params.append(lower.date())
+    if upper is not None:
+        conditions.append("day < %s")
+        params.append(upper.date())
+    if month is not None:
+        conditions.append("MONTH(day) = %s")
+        params.append(month)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT COALESCE(SUM(movements), 0) FROM {rollup}{where}", tuple(params))
+    total = int(cursor.fetchone()[0])
+    cursor.close()
+
+    flag_condition = f"{flag_column} = 1"
+    where = f"{where} AND {flag_condition}" if where else f" WHERE {flag_condition}"
+    keys = ", ".join(f"NULLIF({col}, '') AS {col}" for col in ["RAVRAKENAME", "RAVSTTNFROM", "RAVSRVGSTTN"])
+    df = pd.read_sql(
+        f"SELECT NULLIF(day, %s) AS Date, {keys}, movements AS Movements, "
+        f"first_time AS First_Time, last_time AS Last_Time FROM {rollup}{where}",
+        conn,
+        params=(rollup_null_day, *params)
+    )
+    df["Date"] = pd.to_datetime(df["Date"])
+    return df, total
+
+
+def parquet_source_columns():
+    if "parquet" not in _source_columns:
+        schema = pq.ParquetDataset(os.path.join(parquet_dir, table_name)).schema
+        _source_columns["parquet"] = (
+            list(schema.names),
+            [field.name for field in schema
+             if (pa.types.is_string(field.type) or pa.types.is_large_string(field.type))
+             and field.name != keyword_column]
+        )
+    return _source_columns["parquet"]
+
+
+def parquet_time_is_timestamp():
+    if "parquet_time" not in _source_columns:
+        schema = pq.ParquetDataset(os.path.join(parquet_dir, table_name)).schema
+        _source_columns["parquet_time"] = pa.types.is_timestamp(schema.field("RADSTTSCHNGTIME").type)
+    return _source_columns["parquet_time"]
+
+
+def view_columns(view, source_columns):
+    # Columns to read and whether the source already carries the flag
+    names, text_columns = source_columns
+    declared = DASHBOARD_VIEWS[view]
+    if flag_column in names and keyword_column in names:
+        return declared + [keyword_column], True
+    print(f"Warning: '{flag_column}' not found, re-run DB_Dump.py → classifying rows in memory")
+    scanned = military_scan_columns if military_scan_columns is not None else rule_columns(text_columns)
+    return declared + [col for col in scanned if col not in declared], False
+
+
+def connect_local():
     conn = mysql.connector.connect(
         host=local_host,
         user=local_user,
         password=local_password,
         database=local_db
     )
-    df = pd.read_sql(f"SELECT * FROM {table_name}", conn)
-    conn.close()
+    # Pooled connections live long: without autocommit a reused connection
+    # would keep reading the snapshot of its first query
+    conn.autocommit = True
+    try:
+        # MySQL 8 otherwise serves UPDATE_TIME from a cache up to a day old;
+        # MariaDB and MySQL 5.7 have no such cache (nor the variable)
+        cursor = conn.cursor()
+        cursor.execute("SET SESSION information_schema_stats_expiry = 0")
+        cursor.close()
+    except mysql.connector.Error:
+        pass
+    return conn
 
-    if "RADSTTSCHNGTIME" in df.columns:
-        df["RADSTTSCHNGTIME"] = pd.to_datetime(df["RADSTTSCHNGTIME"], errors="coerce")
-        df["Date"] = df["RADSTTSCHNGTIME"].dt.date
-        df["Year"] = df["RADSTTSCHNGTIME"].dt.year
-        df["Month"] = df["RADSTTSCHNGTIME"].dt.month  # added for easier filtering
 
-    if selected_year is not None:
-        df = df[df["Year"] == selected_year]
+_pool_idle = []  # most recently used last
+_pool_lock = threading.Lock()
+_pool_slots = None
+pool_stats = {"created": 0, "acquired": 0, "timeouts": 0, "reconnects": 0, "discarded": 0,
+              "wait_ms_total": 0.0, "wait_ms_max": 0.0}
+
+
+@contextmanager
+def pooled_connection():
+    global _pool_slots
+    with _pool_lock:
+        if _pool_slots is None:
+            _pool_slots = threading.BoundedSemaphore(pool_size)
+    start = time.perf_counter()
+    if not _pool_slots.acquire(timeout=pool_timeout_seconds):
+        with _pool_lock:
+            pool_stats["timeouts"] += 1
+        raise mysql.connector.errors.PoolError(
+            f"No free connection after {pool_timeout_seconds}s (pool size {pool_size})"
+        )
+    waited = (time.perf_counter() - start) * 1000
+    conn = None
+    try:
+        with _pool_lock:
+            pool_stats["acquired"] += 1
+            pool_stats["wait_ms_total"] += waited
+            pool_stats["wait_ms_max"] = max(pool_stats["wait_ms_max"], waited)
+            conn = _pool_idle.pop() if _pool_idle else None
+        if conn is not None:
+            # Health check on every checkout: the server may have dropped it
+            # at any time (wait_timeout, restart, a killed session)
+            try:
+                conn.ping(reconnect=False)
+            except mysql.connector.Error:
+                try:
+                    conn.close()
+                except mysql.connector.Error:
+                    pass
+                conn = None
+                with _pool_lock:
+                    pool_stats["reconnects"] += 1
+        if conn is None:
+            conn = connect_local()
+            with _pool_lock:
+                pool_stats["created"] += 1
+        yield conn
+    except Exception:
+        # The connection may be half-way through a result set, do not reuse it
+        if conn is not None:
+            try:
+                conn.close()
+            except mysql.connector.Error:
+                pass
+            conn = None
+            with _pool_lock:
+                pool_stats["discarded"] += 1
+        raise
+    finally:
+        if conn is not None:
+            with _pool_lock:
+                _pool_idle.append(conn)
+        _pool_slots.release()
+
+
+def pool_info():
+    with _pool_lock:
+        acquired = pool_stats["acquired"]
+        return {
+            **pool_stats,
+            "wait_ms_avg": pool_stats["wait_ms_total"] / acquired if acquired else 0.0,
+            "size": pool_size,
+            "idle": len(_pool_idle)
+        }
+
+
+def active_backend():
+    if data_backend == "parquet":
+        if pq is not None and os.path.isdir(os.path.join(parquet_dir, table_name)):
+            return "parquet"
+        print("Warning: Parquet snapshot not available → falling back to MySQL")
+    return "mysql"
+
+
+def read_data_version(backend):
+    if backend == "parquet":
+        newest, files = 0, 0
+        for root, _, names in os.walk(os.path.join(parquet_dir, table_name)):
+            for name in names:
+                if name.endswith(".parquet"):
+                    newest = max(newest, os.stat(os.path.join(root, name)).st_mtime_ns)
+                    files += 1
+        return newest, files
+    # DB_Dump.py bumps version_table with every change it commits: new rows,
+    # reclassified flags, deduplication, rollup rebuilds, retired partitions.
+    # The rollup is written in the same transactions, so this covers it too.
+    # Max local_id and UPDATE_TIME (see connect_local) catch writes made
+    # outside DB_Dump.py and mirrors synced before version_table existed.
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"SELECT version FROM {version_table} WHERE table_name = %s", (table_name,))
+            row = cursor.fetchone()
+            version = row[0] if row else None
+        except mysql.connector.errors.ProgrammingError:
+            version = None  # no version table yet
+        cursor.execute(
+            "SELECT UPDATE_TIME FROM INFORMATION_SCHEMA.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+            (table_name,)
+        )
+        row = cursor.fetchone()
+        update_time = row[0] if row else None
+        cursor.execute(f"SELECT MAX(local_id) FROM {table_name}")
+        max_id = cursor.fetchone()[0]
+        cursor.close()
+    return version, update_time, max_id
+
+
+_cache = OrderedDict()  # key -> (loaded_at, size in bytes, DataFrame)
+_cache_lock = threading.Lock()
+_version = {}  # backend -> (checked_at, token)
+cache_stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0}
+
+
+def data_version(backend):
+    now = time.monotonic()
+    with _cache_lock:
+        checked = _version.get(backend)
+    if checked is not None and now - checked[0] < version_check_seconds:
+        return checked[1]
+    token = read_data_version(backend)
+    with _cache_lock:
+        if checked is not None and checked[1] != token:
+            # Data changed: older entries can never be hit again
+            stale = [key for key in _cache if key[0] == backend]
+            for key in stale:
+                del _cache[key]
+            cache_stats["invalidations"] += len(stale)
+            for name in [name for name in _source_columns if name.startswith(backend)]:
+                del _source_columns[name]
+        _version[backend] = (now, token)
+    return token
+
+
+def cache_info():
+    with _cache_lock:
+        total = cache_stats["hits"] + cache_stats["misses"]
+        return {
+            **cache_stats,
+            "hit_rate": cache_stats["hits"] / total if total else 0.0,
+            "entries": len(_cache),
+            "mb": sum(size for _, size, _ in _cache.values()) / 2 ** 20
+        }
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+        _version.clear()
+
+
+def load_data(selected_year=None, selected_month=None, start_date=None, end_date=None, view="military"):
+    backend = active_backend()
+    if not cache_enabled:
+        return query_data(backend, selected_year, selected_month, start_date, end_date, view)
+
+    key = (backend, view, selected_year, selected_month, start_date, end_date, data_version(backend))
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None and time.monotonic() - entry[0] > cache_ttl_seconds:
+            del _cache[key]
+            cache_stats["expired"] += 1
+            entry = None
+        if entry is not None:
+            _cache.move_to_end(key)
+            cache_stats["hits"] += 1
+            # Shallow copy: callers may add columns, the cached frame stays as loaded
+            return entry[2].copy(deep=False)
+        cache_stats["misses"] += 1
+
+    df = query_data(backend, selected_year, selected_month, start_date, end_date, view)
+    size = int(df.memory_usage(deep=True).sum())
+    limit = cache_max_mb * 2 ** 20
+    if size <= limit:
+        with _cache_lock:
+            _cache[key] = (time.monotonic(), size, df)
+            _cache.move_to_end(key)
+            used = sum(entry_size for _, entry_size, _ in _cache.values())
+            while used > limit:
+                _, (_, evicted_size, _) = _cache.popitem(last=False)
+                used -= evicted_size
+                cache_stats["evictions"] += 1
+    return df.copy(deep=False)
+
+
+_categories = {}  # column -> CategoricalDtype, only ever appended to
+_categories_lock = threading.Lock()
+
+
+def shared_categorical(values, col):
+    # Normalizes each distinct value once, then codes the column against one
+    # category list per column that grows across requests, so a code means
+    # the same value in every cached frame.
+    codes, uniques = pd.factorize(values)
+    normalized = pd.Index(uniques.astype(str)).str.strip().str.upper()
+    with _categories_lock:
+        dtype = _categories.get(col, pd.CategoricalDtype([]))
+        new = normalized.unique().difference(dtype.categories)
+        if len(new):
+            dtype = pd.CategoricalDtype(dtype.categories.append(new))
+            _categories[col] = dtype
+    mapping = np.append(dtype.categories.get_indexer(normalized), -1)
+    return pd.Categorical.from_codes(mapping[codes], dtype=dtype)
+
+
+timestamp_stats = {"parsed_loads": 0, "malformed_rows": 0}
+_timestamp_lock = threading.Lock()
+
+
+def parse_timestamps(values):
+    # Known format instead of per-call inference; cache=True parses each
+    # repeated string once. Values that do not fit become NaT and are
+    # counted, never guessed at.
+    parsed = pd.to_datetime(values, format=timestamp_format, errors="coerce", cache=True)
+    bad = parsed.isna() & values.notna()
+    malformed = int(bad.sum())
+    if malformed:
+        examples = ", ".join(repr(str(v)) for v in values[bad].unique()[:3])
+        print(f"Warning: {malformed} RADSTTSCHNGTIME values do not match '{timestamp_format}' "
+              f"→ left empty (e.g. {examples})")
+    with _timestamp_lock:
+        timestamp_stats["parsed_loads"] += 1
+        timestamp_stats["malformed_rows"] += malformed
+    return parsed, malformed
+
+
+def query_data(backend, selected_year=None, selected_month=None, start_date=None, end_date=None,
+               view="military"):
+    lower, upper = time_range(selected_year, selected_month, start_date, end_date)
+    # A month without a year means that month in every year
+    any_year_month = selected_month if selected_year is None else None
+
+    if backend == "parquet":
+        columns, flagged = view_columns(view, parquet_source_columns())
+        df = read_parquet_snapshot(lower, upper, selected_month, columns, flagged_only=flagged)
+        if flagged:
+            total = count_parquet_rows(lower, upper, selected_month)
+    else:
+        conditions, params = [], []
+        if lower is not None:
+            conditions.append("RADSTTSCHNGTIME >= %s")
+            params.append(lower.to_pydatetime())
+        if upper is not None:
+            conditions.append("RADSTTSCHNGTIME < %s")
+            params.append(upper.to_pydatetime())
+        if any_year_month is not None:
+            conditions.append("MONTH(RADSTTSCHNGTIME) = %s")
+            params.append(any_year_month)
+        if conditions and lower is None:
+            # Partitioned mirrors hold rows without a timestamp at null_timestamp
+            conditions.append("RADSTTSCHNGTIME <> %s")
+            params.append(null_timestamp)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with pooled_connection() as conn:
+            if use_rollups and view == "military" and rollup_available(conn):
+                df, total = read_rollup(conn, lower, upper, any_year_month)
+                flagged = True
+            else:
+                columns, flagged = view_columns(view, mysql_source_columns(conn))
+                if flagged:
+                    # Non-military rows are only counted, never transferred
+                    cursor = conn.cursor()
+                    cursor.execute(f"SELECT COUNT(*) FROM {table_name}{where}", tuple(params))
+                    total = cursor.fetchone()[0]
+                    cursor.close()
+                    flag_condition = f"{flag_column} = 1"
+                    where = f"{where} AND {flag_condition}" if where else f" WHERE {flag_condition}"
+                selected = [f"NULLIF({col}, '{null_timestamp}') AS {col}" if col == "RADSTTSCHNGTIME" else col
+                            for col in columns]
+                df = pd.read_sql(
+                    f"SELECT {', '.join(selected)} FROM {table_name}{where}",
+                    conn,
+                    params=tuple(params) or None
+                )
+
+    if not flagged:
+        df[keyword_column] = military_matches(df)
+        total = len(df)
+        df = df.loc[df[keyword_column].notna(), DASHBOARD_VIEWS[view] + [keyword_column]]
+        df = df.reset_index(drop=True)
+
+    for col, dtype in COLUMN_DTYPES.items():
+        if col in df.columns:
+            df[col] = shared_categorical(df[col], col) if dtype == "category" else df[col].astype(dtype)
+
+    if "RADSTTSCHNGTIME" in df.columns:
+        # DATETIME mirrors already arrive as datetime64, only legacy TEXT ones need parsing
+        if not pd.api.types.is_datetime64_any_dtype(df["RADSTTSCHNGTIME"]):
+            df["RADSTTSCHNGTIME"], df.attrs["malformed_timestamps"] = parse_timestamps(df["RADSTTSCHNGTIME"])
+        df["Date"] = df["RADSTTSCHNGTIME"].dt.normalize()
+    if "Date" in df.columns:
+        # Calendar columns are derived here once; cached frames reuse them
+        df["Year"] = df["Date"].dt.year
+        df["Month"] = df["Date"].dt.month  # added for easier filtering
+    # Only military rows are returned, the KPI still needs the full count
+    df.attrs["total_records"] = total
 
     return df
 
 
 # ---------------------------
-# Detect Military Records (unchanged)
+# Charts (sum Movements: rollup rows or one per raw row)
 # ---------------------------
-def detect_military(row):
-    text = " ".join(str(x) for x in row.values).upper()
-    keywords = ["DRDO", "ARMY", "MILY", "MILITARY", "DEFENCE", "DEFENSE", "ORDNANCE", "SPL"]
-    return any(k in text for k in keywords)
+def as_movements(df):
+    # Rollup rows carry a movement count and first/last times, a raw row is
+    # one movement at RADSTTSCHNGTIME. Charts sum Movements either way.
+    if "Movements" in df.columns:
+        return df
+    return df.assign(Movements=1, First_Time=df["RADSTTSCHNGTIME"], Last_Time=df["RADSTTSCHNGTIME"])
 
 
-# ---------------------------
-# Charts (unchanged)
-# ---------------------------
 def build_figure(mil_df):
     if mil_df.empty:
         return {}
-    summary = mil_df["RAVRAKENAME"].astype(str).value_counts().reset_index()
+    mil_df = as_movements(mil_df)
+    summary = (
+        mil_df.groupby("RAVRAKENAME", observed=True)["Movements"]
+        .sum()
+        .sort_values(ascending=False)
+        .reset_index()
+    )
     summary.columns = ["Rake Name", "Count"]
     fig = px.bar(
         summary,
@@ -95,15 +661,17 @@ def build_figure(mil_df):
     return fig
 
 
-def build_datewise_figure(mil_df):
+def build_datewise_figure(mil_df, barmode="stack"):
     if mil_df.empty or "Date" not in mil_df.columns:
         return {}
+    # Day as datetime64 plus the rake's category code, not Python date objects
     summary = (
-        mil_df.groupby(["Date", "RAVRAKENAME"])
-        .size()
+        as_movements(mil_df).groupby(["Date", "RAVRAKENAME"], observed=True)["Movements"]
+        .sum()
         .reset_index(name="Count")
         .sort_values("Date")
     )
+    summary["Date"] = summary["Date"].dt.date
     fig = px.bar(
         summary,
         x="Date",
@@ -113,21 +681,21 @@ def build_datewise_figure(mil_df):
         title="Date-wise Military Movement Count (Rake-wise)",
         template="plotly_white"
     )
-    fig.update_layout(barmode="stack")
+    fig.update_layout(barmode=barmode)
     fig.update_traces(textposition="inside")
     fig.update_yaxes(tickformat="d")
     return fig
 
 
 def build_monthwise_figure(mil_df):
-    if mil_df.empty or "Date" not in mil_df.columns:
+    if mil_df.empty or "Month" not in mil_df.columns:
         return {}
-    df_m = mil_df.copy()
-    df_m["MonthNum"] = pd.to_datetime(df_m["Date"]).dt.month
+    # Month was derived once by load_data(), nothing is re-parsed here
     summary = (
-        df_m.groupby("MonthNum")
-        .size()
+        as_movements(mil_df).groupby("Month")["Movements"]
+        .sum()
         .reindex(range(1, 13), fill_value=0)
+        .rename_axis("MonthNum")
         .reset_index(name="Count")
     )
     month_map = {
@@ -162,126 +730,118 @@ def build_monthwise_figure(mil_df):
 
 
 # ---------------------------
-# From → To Summary (unchanged)
+# From → To Summary
 # ---------------------------
 def build_from_to_summary(mil_df):
     if mil_df.empty:
         return pd.DataFrame()
+    # min/max run on datetime64 values rather than Date's Python date objects
     summary = (
-        mil_df.groupby(["RAVSTTNFROM", "RAVSRVGSTTN"])
+        as_movements(mil_df).groupby(["RAVSTTNFROM", "RAVSRVGSTTN"], observed=True)
         .agg(
-            Movement_Count=("Date", "size"),
-            First_Movement=("Date", "min"),
-            Last_Movement=("Date", "max")
+            Movement_Count=("Movements", "sum"),
+            First_Movement=("First_Time", "min"),
+            Last_Movement=("Last_Time", "max")
         )
         .reset_index()
         .sort_values("Movement_Count", ascending=False)
     )
-    summary["Duration_Days"] = (
-            pd.to_datetime(summary["Last_Movement"]) -
-            pd.to_datetime(summary["First_Movement"])
-    ).dt.days
+    first = summary["First_Movement"].dt.normalize()
+    last = summary["Last_Movement"].dt.normalize()
+    summary["Duration_Days"] = (last - first).dt.days
+    summary["First_Movement"] = first.dt.date
+    summary["Last_Movement"] = last.dt.date
     return summary
 
 
 # ────────────────────────────────────────────────
 # Map: From → To military movements with direction arrows
 # ────────────────────────────────────────────────
-def build_movement_map(mil_df):
+def build_movement_map(mil_df, top_routes=None):
     if mil_df.empty or "RAVSTTNFROM" not in mil_df.columns or "RAVSRVGSTTN" not in mil_df.columns:
         return go.Figure().update_layout(title="No movement data available")
 
     flows = (
-        mil_df.groupby(["RAVSTTNFROM", "RAVSRVGSTTN"])
-        .size()
+        as_movements(mil_df).groupby(["RAVSTTNFROM", "RAVSRVGSTTN"], observed=True)["Movements"]
+        .sum()
         .reset_index(name="Count")
         .sort_values("Count", ascending=False)
-        .head(120)
+        .head(top_routes or map_top_routes)
     )
 
-    lats_from = []
-    lons_from = []
-    lats_to   = []
-    lons_to   = []
-    counts    = []
-    hovers    = []
-
-    for _, row in flows.iterrows():
-        fr = str(row["RAVSTTNFROM"]).strip().upper()
-        to = str(row["RAVSRVGSTTN"]).strip().upper()
-        cnt = row["Count"]
+    # Coordinates for both ends in one merge; stations not in the index are reported
+    flows, unmatched = attach_coordinates(flows, "RAVSTTNFROM", "RAVSRVGSTTN")
+    missing_note = ""
+    if unmatched:
+        missing_note = (f"{len(unmatched)} station codes without coordinates: "
+                        f"{', '.join(unmatched[:10])}{' …' if len(unmatched) > 10 else ''}")
+        print(f"Warning: {missing_note}")
 
-        if fr in STATION_COORDS and to in STATION_COORDS:
-            f = STATION_COORDS[fr]
-            t = STATION_COORDS[to]
+    if flows.empty:
+        fig = go.Figure().update_layout(title="No coordinates found for these stations")
+        if missing_note:
+            fig.add_annotation(text=missing_note, showarrow=False, xref="paper", yref="paper", x=0, y=1)
+        return fig
 
-            lats_from.append(f["Latitude"])
-            lons_from.append(f["Longitude"])
-            lats_to.append(t["Latitude"])
-            lons_to.append(t["Longitude"])
-            counts.append(cnt)
-            hovers.append(f"{fr} → {to}<br>Movements: {cnt}")
+    lats_from, lons_from = flows["From_Latitude"].to_numpy(), flows["From_Longitude"].to_numpy()
+    lats_to, lons_to = flows["To_Latitude"].to_numpy(), flows["To_Longitude"].to_numpy()
+    counts = flows["Count"].to_numpy()
+    hovers = (flows["RAVSTTNFROM"].astype(str) + " → " + flows["RAVSRVGSTTN"].astype(str)
+              + "<br>Movements: " + flows["Count"].astype(str)).to_numpy()
 
-    if not lats_from:
-        return go.Figure().update_layout(title="No coordinates found for these stations")
+    # Bearing (direction) in degrees clockwise from North, for all routes at once
+    lat1, lon1, lat2, lon2 = np.radians(lats_from), np.radians(lons_from), np.radians(lats_to), np.radians(lons_to)
+    dlon = lon2 - lon1
+    y = np.sin(dlon) * np.cos(lat2)
+    x = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlon)
+    angles = (np.degrees(np.arctan2(y, x)) + 360) % 360
 
     fig = go.Figure()
 
-    # Helper: calculate bearing (direction) in degrees clockwise from North
-    def get_bearing(lat1, lon1, lat2, lon2):
-        lat1 = math.radians(lat1)
-        lon1 = math.radians(lon1)
-        lat2 = math.radians(lat2)
-        lon2 = math.radians(lon2)
-
-        dlon = lon2 - lon1
-        y = math.sin(dlon) * math.cos(lat2)
-        x = math.cos(lat1) * math.sin(lat2) - math.sin(lat1) * math.cos(lat2) * math.cos(dlon)
-        bearing = math.degrees(math.atan2(y, x))
-        return (bearing + 360) % 360
-
-    # Draw lines
-    for latf, lonf, latt, lont in zip(lats_from, lons_from, lats_to, lons_to):
-        fig.add_trace(go.Scattermap(
-            lat=[latf, latt],
-            lon=[lonf, lont],
-            mode="lines",
-            line=dict(width=1.8, color="#c0392b"),
-            opacity=0.6,
-            hoverinfo="skip"
-        ))
+    # Draw lines: one trace, routes separated by None gaps
+    gaps = np.full(len(flows), None, dtype=object)
+    fig.add_trace(go.Scattermap(
+        lat=np.column_stack([lats_from, lats_to, gaps]).ravel(),
+        lon=np.column_stack([lons_from, lons_to, gaps]).ravel(),
+        mode="lines",
+        line=dict(width=1.8, color="#c0392b"),
+        opacity=0.6,
+        hoverinfo="skip"
+    ))
 
     # Draw small arrows at destination (pointing in travel direction)
-    for latf, lonf, latt, lont in zip(lats_from, lons_from, lats_to, lons_to):
-        angle = get_bearing(latf, lonf, latt, lont)
-        fig.add_trace(go.Scattermap(
-            lat=[latt],
-            lon=[lont],
-            mode="markers",
-            marker=dict(
-                symbol="arrow-bar-up",
-                size=10,
-                color="#c0392b",
-                opacity=0.95,
-                angle=angle
-            ),
-            hoverinfo="skip"
-        ))
+    fig.add_trace(go.Scattermap(
+        lat=lats_to,
+        lon=lons_to,
+        mode="markers",
+        marker=dict(
+            symbol="arrow-bar-up",
+            size=10,
+            color="#c0392b",
+            opacity=0.95,
+            angle=angles
+        ),
+        hoverinfo="skip"
+    ))
 
     # Station markers + count label (only at origin)
     fig.add_trace(go.Scattermap(
-        lat=lats_from + lats_to,
-        lon=lons_from + lons_to,
+        lat=np.concatenate([lats_from, lats_to]),
+        lon=np.concatenate([lons_from, lons_to]),
         mode="markers+text",
         marker=dict(size=7, color="#2c3e50", opacity=0.9),
-        text=[f"{c}" if i < len(counts) else "" for i, c in enumerate(counts * 2)],
+        text=np.concatenate([counts.astype(str), np.full(len(counts), "")]),
         textposition="top center",
         textfont=dict(size=9, color="#111"),
-        hovertext=hovers * 2,
+        hovertext=np.concatenate([hovers, hovers]),
         hoverinfo="text",
         name="Stations & Flows"
     ))
 
+    if missing_note:
+        fig.add_annotation(text=missing_note, showarrow=False, xref="paper", yref="paper",
+                           x=0, y=0, xanchor="left", yanchor="bottom", bgcolor="white")
+
     fig.update_layout(
         title="Military Rake Movements (DRDO/SPL) — From → To",
         map_style="open-street-map",
@@ -352,6 +912,20 @@ KPI = {
 # ---------------------------
 app = Dash(__name__)
 
+
+@app.server.route("/stats")
+def stats():
+    # Counters for monitoring, e.g. curl http://127.0.0.1:8050/stats
+    return {
+        "load_data_cache": cache_info(),
+        "mysql_pool": pool_info(),
+        "timestamps": dict(timestamp_stats),
+        "station_index": index_info(),
+        "panel_cache": panel_info(),
+        "jobs": job_info()
+    }
+
+
 app.layout = html.Div(style=PAGE, children=[
     html.Div(style=CONTAINER, children=[
         # Header
@@ -413,7 +987,21 @@ app.layout = html.Div(style=PAGE, children=[
                 id="submit-btn",
                 n_clicks=0,
                 style={"marginTop": "20px", "padding": "10px 24px", "fontWeight": "bold"}
-            )
+            ),
+            html.Button(
+                "Cancel",
+                id="cancel-btn",
+                n_clicks=0,
+                style={"marginTop": "20px", "marginLeft": "12px", "padding": "10px 24px"}
+            ),
+
+            # Progress of the background refresh (see refresh_job)
+            html.Div(style={"marginTop": "16px"}, children=[
+                html.Progress(id="job-progress", value="0", max="100", style={"width": "320px"}),
+                html.Span(id="job-status", style={"marginLeft": "12px", "color": "#7f8c8d"})
+            ]),
+            dcc.Store(id="refresh-job"),
+            dcc.Interval(id="job-poll", interval=job_poll_ms, disabled=True)
         ]),
 
         # KPIs
@@ -429,11 +1017,32 @@ app.layout = html.Div(style=PAGE, children=[
             ])
         ]),
 
-        # Graphs
-        html.Div(style=CARD, children=[dcc.Graph(id="graph-rake")]),
-        html.Div(style=CARD, children=[dcc.Graph(id="graph-datewise")]),
-        html.Div(style=CARD, children=[dcc.Graph(id="graph-monthwise")]),
-        html.Div(style=CARD, children=[dcc.Graph(id="graph-map")]),
+        # Key of the filtered dataset held server-side (see store_dataset)
+        dcc.Store(id="dataset-key"),
+
+        # Graphs (each one loads on its own)
+        html.Div(style=CARD, children=[dcc.Loading(dcc.Graph(id="graph-rake"))]),
+        html.Div(style=CARD, children=[
+            dcc.RadioItems(
+                id="datewise-mode",
+                options=[{"label": "Stacked", "value": "stack"}, {"label": "Grouped", "value": "group"}],
+                value="stack",
+                inline=True
+            ),
+            dcc.Loading(dcc.Graph(id="graph-datewise"))
+        ]),
+        html.Div(style=CARD, children=[dcc.Loading(dcc.Graph(id="graph-monthwise"))]),
+        html.Div(style=CARD, children=[
+            html.Div("Routes on map", style={"fontWeight": "bold", "marginBottom": "8px"}),
+            dcc.Dropdown(
+                id="map-routes",
+                options=[{"label": f"Top {n}", "value": n} for n in (100, 250, 500, 1000, 2500)],
+                value=map_top_routes,
+                clearable=False,
+                style={"width": "220px"}
+            ),
+            dcc.Loading(dcc.Graph(id="graph-map"))
+        ]),
 
         # Table
         html.Div(style=CARD, children=[
@@ -468,58 +1077,243 @@ app.layout = html.Div(style=PAGE, children=[
 
 
 # ---------------------------
-# CALLBACK: load and filter data
+# Server-side datasets
+# ---------------------------
+_datasets = OrderedDict()  # key -> (total records, filtered military frame)
+_datasets_lock = threading.Lock()
+
+
+def military_dataset(selected_year=None, selected_month=None):
+    df = load_data(selected_year, selected_month)
+    total = df.attrs.get("total_records", len(df))
+    # load_data() returns flagged rows only
+    mil_df = df
+    if not mil_df.empty:
+        # Tested once per distinct rake name, not per row
+        rake_names = mil_df["RAVRAKENAME"].cat.categories
+        mil_df = mil_df[mil_df["RAVRAKENAME"].isin(
+            rake_names[rake_names.str.contains(TARGET_RAKE, case=False, regex=False)]
+        )]
+    return total, mil_df
+
+
+def store_dataset(selected_year=None, selected_month=None):
+    # The key names the filter and the data version, so the same filter on
+    # unchanged data reuses the frame already held
+    backend = active_backend()
+    key = f"{backend}|{selected_year}|{selected_month}|{data_version(backend)}"
+    get_dataset(key)
+    return key
+
+
+def get_dataset(key):
+    # (total, mil_df) for a key from store_dataset; a key evicted since (or
+    # from before a restart) is rebuilt from the filter it names
+    if key is None:
+        raise PreventUpdate
+    with _datasets_lock:
+        entry = _datasets.get(key)
+        if entry is not None:
+            _datasets.move_to_end(key)
+            return entry
+    _, selected_year, selected_month, _ = key.split("|", 3)
+    selected_year = None if selected_year == "None" else int(selected_year)
+    selected_month = None if selected_month == "None" else int(selected_month)
+    entry = military_dataset(selected_year, selected_month)
+    with _datasets_lock:
+        _datasets[key] = entry
+        _datasets.move_to_end(key)
+        while len(_datasets) > dataset_slots:
+            _datasets.popitem(last=False)
+    return entry
+
+
+_panels = OrderedDict()  # (panel, dataset key, options) -> JSON text
+_panels_lock = threading.Lock()
+_panels_bytes = 0
+panel_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def cached_panel(panel, key, options, build):
+    # build() only runs on a miss; hits skip the dataset and the builder
+    global _panels_bytes
+    if key is None:
+        raise PreventUpdate
+    if not panel_cache_enabled:
+        return build()
+    cache_key = (panel, key, options)
+    with _panels_lock:
+        text = _panels.get(cache_key)
+        if text is not None:
+            _panels.move_to_end(cache_key)
+            panel_stats["hits"] += 1
+            return json.loads(text)
+        panel_stats["misses"] += 1
+
+    text = to_json_plotly(build())
+    limit = panel_cache_max_mb * 2 ** 20
+    if len(text) <= limit:
+        with _panels_lock:
+            if cache_key not in _panels:
+                _panels[cache_key] = text
+                _panels_bytes += len(text)
+            while _panels_bytes > limit:
+                _, evicted = _panels.popitem(last=False)
+                _panels_bytes -= len(evicted)
+                panel_stats["evictions"] += 1
+    return json.loads(text)
+
+
+def panel_info():
+    with _panels_lock:
+        total = panel_stats["hits"] + panel_stats["misses"]
+        return {
+            **panel_stats,
+            "hit_rate": panel_stats["hits"] / total if total else 0.0,
+            "entries": len(_panels),
+            "mb": _panels_bytes / 2 ** 20
+        }
+
+
+# ---------------------------
+# Background refresh job
+# ---------------------------
+def refresh_job(selected_year, selected_month, barmode, top_routes):
+    # Loads the filtered dataset, then builds every panel into the panel
+    # cache, so the panel callbacks only pick up finished JSON.
+    # Cancellation takes effect between steps.
+    def run(report):
+        report(0.05, "Loading data")
+        key = store_dataset(selected_year, selected_month)
+        if panel_cache_enabled:
+            steps = [
+                ("KPIs", lambda: update_kpis(key)),
+                ("rake chart", lambda: update_rake_panel(key)),
+                ("date-wise chart", lambda: update_datewise_panel(key, barmode)),
+                ("month-wise chart", lambda: update_monthwise_panel(key)),
+                ("map", lambda: update_map_panel(key, top_routes)),
+                ("From → To table", lambda: update_from_to_panel(key)),
+            ]
+            for i, (label, build) in enumerate(steps):
+                report(0.4 + 0.6 * i / len(steps), f"Building {label}")
+                build()
+        return key
+    return run
+
+
+# ---------------------------
+# CALLBACK: start the refresh (panels below pick up the dataset by key)
 # ---------------------------
 @app.callback(
-    Output("kpi-total", "children"),
-    Output("kpi-military", "children"),
-    Output("graph-rake", "figure"),
-    Output("graph-datewise", "figure"),
-    Output("graph-monthwise", "figure"),
-    Output("graph-map", "figure"),
-    Output("from-to-table", "data"),
+    Output("refresh-job", "data"),
+    Output("job-poll", "disabled"),
     Input("submit-btn", "n_clicks"),
     State("year-dropdown", "value"),
-    State("month-dropdown", "value")
+    State("month-dropdown", "value"),
+    State("datewise-mode", "value"),
+    State("map-routes", "value")
 )
-def refresh_dashboard(n_clicks, selected_year, selected_month):
+def refresh_dashboard(n_clicks, selected_year, selected_month, barmode, top_routes):
     if n_clicks == 0:
-        df = load_data()
-    else:
-        df = load_data(selected_year)
-        if selected_month is not None and "Date" in df.columns:
-            df = df[df["Month"] == selected_month]
+        selected_year, selected_month = None, None
+    # Same filter already queued or running (e.g. another user) → that job is
+    # reused; this page subscribes to it so its Cancel only detaches this page
+    subscriber = uuid.uuid4().hex
+    job_id = submit(
+        f"refresh|{selected_year}|{selected_month}",
+        refresh_job(selected_year, selected_month, barmode, top_routes),
+        subscriber
+    )
+    return {"job_id": job_id, "subscriber": subscriber}, False
+
+
+@app.callback(
+    Output("dataset-key", "data"),
+    Output("job-progress", "value"),
+    Output("job-status", "children"),
+    Output("job-poll", "disabled", allow_duplicate=True),
+    Input("job-poll", "n_intervals"),
+    Input("cancel-btn", "n_clicks"),
+    State("refresh-job", "data"),
+    prevent_initial_call=True
+)
+def poll_refresh_job(n_intervals, cancel_clicks, job):
+    if job is None:
+        raise PreventUpdate
+    status = job_status(job["job_id"])
+    if status is None:
+        return no_update, "0", "Refresh job not found", True
+    progress = str(int(status["progress"] * 100))
+    if ctx.triggered_id == "cancel-btn" and status["status"] in ("queued", "running"):
+        # The job itself only stops if no other page is waiting for it
+        cancel(job["job_id"], job["subscriber"])
+        return no_update, progress, "Cancelled", True
+    if status["status"] == "done":
+        return status["result"], "100", "", True
+    if status["status"] in ("failed", "cancelled"):
+        return no_update, progress, status["message"], True
+    return no_update, progress, status["message"], False
 
-    if df.empty:
-        return 0, 0, {}, {}, {}, {}, []
 
-    df["Military_Flag"] = df.apply(detect_military, axis=1)
-    mil_df = df[df["Military_Flag"]].copy()
+# ---------------------------
+# CALLBACKS: one per panel
+# ---------------------------
+def kpi_values(key):
+    total, mil_df = get_dataset(key)
+    if total == 0 or mil_df.empty:
+        return [total, 0]
+    return [total, int(as_movements(mil_df)["Movements"].sum())]
 
-    if mil_df.empty:
-        return len(df), 0, {}, {}, {}, go.Figure(), []
-
-    TARGET_RAKE = "DRDO/SPL"
-    mil_df = mil_df[
-        mil_df["RAVRAKENAME"].astype(str)
-        .str.contains(TARGET_RAKE, case=False, na=False)
-    ]
-
-    fig_rake      = build_figure(mil_df)
-    fig_datewise  = build_datewise_figure(mil_df)
-    fig_monthwise = build_monthwise_figure(mil_df)
-    fig_map       = build_movement_map(mil_df)
-    from_to_df    = build_from_to_summary(mil_df)
-
-    return (
-        len(df),
-        len(mil_df),
-        fig_rake,
-        fig_datewise,
-        fig_monthwise,
-        fig_map,
-        from_to_df.to_dict("records")
-    )
+
+@app.callback(
+    Output("kpi-total", "children"),
+    Output("kpi-military", "children"),
+    Input("dataset-key", "data")
+)
+def update_kpis(key):
+    return tuple(cached_panel("kpis", key, None, lambda: kpi_values(key)))
+
+
+@app.callback(Output("graph-rake", "figure"), Input("dataset-key", "data"))
+def update_rake_panel(key):
+    return cached_panel("rake", key, None, lambda: build_figure(get_dataset(key)[1]))
+
+
+@app.callback(
+    Output("graph-datewise", "figure"),
+    Input("dataset-key", "data"),
+    Input("datewise-mode", "value")
+)
+def update_datewise_panel(key, barmode):
+    return cached_panel("datewise", key, barmode,
+                        lambda: build_datewise_figure(get_dataset(key)[1], barmode))
+
+
+@app.callback(Output("graph-monthwise", "figure"), Input("dataset-key", "data"))
+def update_monthwise_panel(key):
+    return cached_panel("monthwise", key, None, lambda: build_monthwise_figure(get_dataset(key)[1]))
+
+
+def map_figure(key, top_routes):
+    total, mil_df = get_dataset(key)
+    if total == 0:
+        return {}
+    return build_movement_map(mil_df, top_routes)
+
+
+@app.callback(
+    Output("graph-map", "figure"),
+    Input("dataset-key", "data"),
+    Input("map-routes", "value")
+)
+def update_map_panel(key, top_routes):
+    return cached_panel("map", key, top_routes, lambda: map_figure(key, top_routes))
+
+
+@app.callback(Output("from-to-table", "data"), Input("dataset-key", "data"))
+def update_from_to_panel(key):
+    return cached_panel("from_to", key, None,
+                        lambda: build_from_to_summary(get_dataset(key)[1]).to_dict("records"))
 
 
 # ---------------------------
@@ -0,0 +1,202 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+# ---------------------------
+# Background jobs for Dashboard.py: a local queue worked by a few threads,
+# with job state and results kept in a SQLite file. No broker, nothing to
+# run besides the dashboard. A job submitted while another one with the
+# same job_key is still queued or running is coalesced into it; each
+# submitter is a subscriber of the job, and the job is only cancelled once
+# every subscriber has cancelled. A cancelled job takes no new subscribers.
+# Jobs report progress through report(progress, message), which is also
+# where a requested cancellation takes effect.
+# ---------------------------
+jobs_db = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dashboard_jobs.sqlite")
+job_workers = 2
+job_keep_seconds = 86400  # finished jobs older than this are deleted
+
+_queue = queue.Queue()
+_lock = threading.Lock()
+_workers = []
+_active = {}  # job_key -> job_id, queued or running
+_cancel = {}  # job_id -> threading.Event
+_subscribers = {}  # job_id -> subscriber ids still waiting for it
+_job_keys = {}  # job_id -> job_key, queued or running
+job_stats = {"submitted": 0, "coalesced": 0, "done": 0, "failed": 0, "cancelled": 0}
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def connect():
+    conn = sqlite3.connect(jobs_db, timeout=10)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def prepare_store():
+    with connect() as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                job_key TEXT NOT NULL,
+                status TEXT NOT NULL,
+                progress REAL NOT NULL DEFAULT 0,
+                message TEXT,
+                result TEXT,
+                created REAL NOT NULL,
+                updated REAL NOT NULL
+            )
+        """)
+        now = time.time()
+        # Jobs of a previous run can never finish now
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', message = 'Interrupted by a restart', updated = ? "
+            "WHERE status IN ('queued', 'running')",
+            (now,)
+        )
+        conn.execute("DELETE FROM jobs WHERE updated < ?", (now - job_keep_seconds,))
+    conn.close()
+
+
+def update_job(job_id, **fields):
+    fields["updated"] = time.time()
+    conn = connect()
+    with conn:
+        conn.execute(
+            f"UPDATE jobs SET {', '.join(f'{name} = ?' for name in fields)} WHERE job_id = ?",
+            (*fields.values(), job_id)
+        )
+    conn.close()
+
+
+def try_update_job(job_id, **fields):
+    # For the worker's error paths: a locked or broken store must not kill the thread
+    try:
+        update_job(job_id, **fields)
+    except sqlite3.Error as e:
+        print(f"Warning: could not record job {job_id} as {fields.get('status', 'updated')}:", e)
+
+
+def start_workers():
+    # Called with _lock held
+    if _workers:
+        return
+    prepare_store()
+    for i in range(job_workers):
+        worker = threading.Thread(target=work, name=f"dashboard-job-{i}", daemon=True)
+        worker.start()
+        _workers.append(worker)
+
+
+def submit(job_key, fn, subscriber):
+    # fn(report) runs on a worker thread; its return value must be JSON-serializable.
+    # subscriber identifies the caller (e.g. one page's request) for cancel().
+    # Returns the job id, which is the id of the in-flight job for job_key if there is one.
+    with _lock:
+        start_workers()
+        if job_key in _active:
+            job_id = _active[job_key]
+            _subscribers[job_id].add(subscriber)
+            job_stats["coalesced"] += 1
+            return job_id
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        conn = connect()
+        with conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, job_key, status, message, created, updated) "
+                "VALUES (?, ?, 'queued', 'Waiting for a worker', ?, ?)",
+                (job_id, job_key, now, now)
+            )
+        conn.close()
+        _active[job_key] = job_id
+        _cancel[job_id] = threading.Event()
+        _subscribers[job_id] = {subscriber}
+        _job_keys[job_id] = job_key
+        job_stats["submitted"] += 1
+    _queue.put((job_id, job_key, fn))
+    return job_id
+
+
+def cancel(job_id, subscriber):
+    # Detaches subscriber from the job. Once nobody is waiting for it, a
+    # queued job never starts and a running one stops at its next report().
+    # Returns True if the job itself is being cancelled.
+    with _lock:
+        event = _cancel.get(job_id)
+        if event is None:
+            return False
+        waiting = _subscribers[job_id]
+        waiting.discard(subscriber)
+        if waiting:
+            return False
+        event.set()
+        # A later submit for the same key starts a fresh job instead of
+        # joining this one on its way out
+        job_key = _job_keys.get(job_id)
+        if _active.get(job_key) == job_id:
+            del _active[job_key]
+    try_update_job(job_id, message="Cancelling")
+    return True
+
+
+def work():
+    while True:
+        job_id, job_key, fn = _queue.get()
+        with _lock:
+            event = _cancel[job_id]
+
+        def report(progress, message=None):
+            if event.is_set():
+                raise JobCancelled()
+            update_job(job_id, progress=progress, message=message)
+
+        outcome = "failed"
+        try:
+            if event.is_set():
+                raise JobCancelled()
+            update_job(job_id, status="running", message="Started")
+            result = fn(report)
+            update_job(job_id, status="done", progress=1.0, message="Done", result=json.dumps(result))
+            outcome = "done"
+        except JobCancelled:
+            try_update_job(job_id, status="cancelled", message="Cancelled")
+            outcome = "cancelled"
+        except Exception as e:
+            print(f"❌ Job {job_key} failed:", e)
+            try_update_job(job_id, status="failed", message=str(e))
+        finally:
+            with _lock:
+                if _active.get(job_key) == job_id:
+                    del _active[job_key]
+                _cancel.pop(job_id, None)
+                _subscribers.pop(job_id, None)
+                _job_keys.pop(job_id, None)
+                job_stats[outcome] += 1
+            _queue.task_done()
+
+
+def job_status(job_id):
+    # {"status", "progress", "message", "result"} or None for an unknown job
+    conn = connect()
+    row = conn.execute(
+        "SELECT status, progress, message, result FROM jobs WHERE job_id = ?", (job_id,)
+    ).fetchone()
+    conn.close()
+    if row is None:
+        return None
+    status = dict(row)
+    status["result"] = json.loads(status["result"]) if status["result"] is not None else None
+    return status
+
+
+def job_info():
+    with _lock:
+        return {**job_stats, "in_flight": len(_active), "queued": _queue.qsize(), "workers": len(_workers)}
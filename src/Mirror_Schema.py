@@ -0,0 +1,14 @@
+import os
+
+# ---------------------------
+# Layout of the local mirror, shared by DB_Dump.py (which writes it) and
+# Dashboard.py (which reads it). Change these here only.
+# ---------------------------
+flag_column = "military_flag"  # 1/0, NULL while a row is not classified yet
+keyword_column = "military_keyword"  # keyword that matched, NULL for non-military rows
+version_table = "dump_data_version"  # per table, bumped with every change DB_Dump.py commits
+rollup_null_day = "1000-01-01"  # stands in for rows without a timestamp (key columns cannot be NULL)
+# Partitioned mirrors cannot store a NULL RADSTTSCHNGTIME (it is part of the
+# primary key), rows without one are stored at this instant instead
+null_timestamp = f"{rollup_null_day} 00:00:00"
+parquet_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "parquet")
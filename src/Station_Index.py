@@ -0,0 +1,103 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+
+# ---------------------------
+# Station coordinates: read from stations_csv once, then kept as a compact
+# .npz next to it (codes + float64 lat/lon) that loads in milliseconds.
+# The cache is rebuilt whenever the CSV is newer.
+# ---------------------------
+stations_csv = os.path.join(os.path.dirname(os.path.abspath(__file__)), "indian_stations.csv")
+stations_cache = None  # None = stations_csv with a .npz extension
+
+_index = None
+_index_lock = threading.Lock()
+unmatched_codes = {}  # station code -> routes seen without coordinates
+
+
+def read_csv_index(path):
+    stations = pd.read_csv(path, usecols=["StationCode", "Latitude", "Longitude"])
+    stations["StationCode"] = stations["StationCode"].astype(str).str.strip().str.upper()
+    stations = stations.dropna(subset=["Latitude", "Longitude"])
+    duplicated = stations["StationCode"].duplicated()
+    if duplicated.any():
+        print(f"Warning: {int(duplicated.sum())} duplicate station codes in {path} → keeping the first")
+        stations = stations[~duplicated]
+    return stations.set_index("StationCode")[["Latitude", "Longitude"]].astype("float64")
+
+
+def write_cache(index, path, source):
+    tmp = path + ".tmp.npz"
+    np.savez(
+        tmp,
+        source=np.array(os.path.abspath(source)),
+        codes=index.index.to_numpy(dtype=str),
+        lat=index["Latitude"].to_numpy(),
+        lon=index["Longitude"].to_numpy()
+    )
+    os.replace(tmp, path)
+
+
+def read_cache(path, source):
+    # None if the cache was built from another CSV (or by an older version)
+    with np.load(path) as data:
+        if "source" not in data.files or str(data["source"]) != os.path.abspath(source):
+            return None
+        return pd.DataFrame(
+            {"Latitude": data["lat"], "Longitude": data["lon"]},
+            index=pd.Index(data["codes"], name="StationCode")
+        )
+
+
+def load_station_index():
+    # Paths are resolved here, so changing stations_csv after import is honoured
+    cache_path = stations_cache or os.path.splitext(stations_csv)[0] + ".npz"
+    csv_time = os.path.getmtime(stations_csv) if os.path.exists(stations_csv) else None
+    cache_time = os.path.getmtime(cache_path) if os.path.exists(cache_path) else None
+    index = None
+    if cache_time is not None and (csv_time is None or cache_time >= csv_time):
+        index = read_cache(cache_path, stations_csv)
+    if index is None and csv_time is not None:
+        index = read_csv_index(stations_csv)
+        try:
+            write_cache(index, cache_path, stations_csv)
+        except OSError as e:
+            print("Warning: could not write the station cache", e)
+    elif index is None:
+        print(f"Warning: {stations_csv} not found → map will show no routes")
+        index = pd.DataFrame({"Latitude": [], "Longitude": []}, index=pd.Index([], name="StationCode"))
+    print(f"→ Loaded {len(index)} Indian railway stations with coordinates")
+    return index
+
+
+def station_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = load_station_index()
+        return _index
+
+
+def attach_coordinates(flows, from_col, to_col):
+    # Adds from/to Latitude/Longitude with one merge per end. Routes with a
+    # station missing from the index are dropped and their codes returned.
+    index = station_index()
+    routes = flows.assign(**{from_col: flows[from_col].astype(str), to_col: flows[to_col].astype(str)})
+    routes = routes.merge(index.add_prefix("From_"), left_on=from_col, right_index=True, how="left")
+    routes = routes.merge(index.add_prefix("To_"), left_on=to_col, right_index=True, how="left")
+    missing_from = routes["From_Latitude"].isna()
+    missing_to = routes["To_Latitude"].isna()
+    unmatched = pd.concat([routes.loc[missing_from, from_col], routes.loc[missing_to, to_col]]).value_counts()
+    with _index_lock:
+        for code, routes_seen in unmatched.items():
+            unmatched_codes[code] = unmatched_codes.get(code, 0) + int(routes_seen)
+    return routes[~(missing_from | missing_to)], list(unmatched.index)
+
+
+def index_info():
+    with _index_lock:
+        return {
+            "stations": None if _index is None else len(_index),
+            "unmatched_codes": dict(sorted(unmatched_codes.items(), key=lambda item: -item[1])[:50])
+        }